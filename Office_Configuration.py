@@ -1,17 +1,47 @@
 
+import time
+
+# Inicio del arranque, antes de importar tkinter (para la traza de arranque)
+STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import os
-import subprocess
 import sys
 import ctypes
-import tempfile
-import threading
-import time
 import math
+import re
+import threading
 from tkinter import font as tkfont
 import itertools
+from functools import lru_cache
+
+import instalador
+from animacion import AnimationClock
+from cache_origen import MIRROR_PORT, SourceCache, is_mirror_url
+from configuracion import Selection, render_selection
+from despacho import TkDispatcher
+from deteccion import describe_plan
+from metricas import NULL_TRACER, StartupTrace, Tracer
+from progreso import format_eta
+from verificaciones import PreflightCache, summarize
+from registro import LogFilter, LogIndex, LogSink, LogStore, SessionLog, format_record
+from traspaso import HANDOFF_FLAG, InstanceServer, forward_to_running, read_handoff, strip_handoff, write_handoff
+from trabajos import DONE, FAILED, JobExecutor, JobFailed
 
+# Intervalo de vaciado de la cola del log y máximo de líneas por lote
+LOG_FLUSH_MS = 50
+LOG_BATCH_MAX = 5000
+
+# Líneas máximas en el widget del log y tamaño de página al desplazarse
+LOG_MAX_LINES = 2000
+LOG_PAGE_LINES = 500
+
+# Espera tras la última tecla antes de aplicar la búsqueda del log
+LOG_FILTER_DELAY_MS = 150
+
+# Los <Configure> de un mismo cuadro se agrupan en una sola actualización del diseño
+LAYOUT_FRAME_MS = 16
 
 
 def resource_path(relative_path):
@@ -24,11 +54,58 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# Cuadros por ciclo de la onda: las dos componentes completan 2 y 3 periodos
+WAVE_FRAME_COUNT = 52
+
+
+@lru_cache(maxsize=None)
+def wave_frames(width=380, center=60, step=8):
+    """Precalcula las coordenadas de cada cuadro de la onda animada."""
+    xs = range(0, width + 1, step)
+    frames = []
+    for frame in range(WAVE_FRAME_COUNT):
+        phase1 = 2 * math.pi * 2 * frame / WAVE_FRAME_COUNT
+        phase2 = 2 * math.pi * 3 * frame / WAVE_FRAME_COUNT
+        points = []
+        for x in xs:
+            wave1 = 25 * math.sin(x * 0.04 + phase1)
+            wave2 = 15 * math.sin(x * 0.06 + phase2 + math.pi/3)
+            points.extend([x, center + wave1 + wave2])
+        frames.append(tuple(points))
+    return tuple(frames)
+
+
+# Imágenes de gradiente ya generadas, por raíz, tamaño y par de colores
+_gradient_cache = {}
+
+
+def gradient_image(master, width, height, top, bottom):
+    """Genera (una sola vez) un gradiente vertical como PhotoImage compartida."""
+    root = master._root()
+    key = (root, width, height, top, bottom)
+    image = _gradient_cache.get(key)
+    if image is None:
+        start = [int(top[i:i + 2], 16) for i in (1, 3, 5)]
+        end = [int(bottom[i:i + 2], 16) for i in (1, 3, 5)]
+        
+        # Cada fila es de un solo color: se arma el búfer completo y se escribe de una vez
+        rows = []
+        for y in range(height):
+            rgb = [int(a + (b - a) * y / height) for a, b in zip(start, end)]
+            color = "#{:02x}{:02x}{:02x}".format(*rgb)
+            rows.append("{" + " ".join([color] * width) + "}")
+        
+        image = tk.PhotoImage(master=root, width=width, height=height)
+        image.put(" ".join(rows))
+        _gradient_cache[key] = image
+    return image
+
+
 class LoadingWindow:
-    def __init__(self, parent, title="Instalando Office"):
+    def __init__(self, parent, title="Instalando Office", on_cancel=None):
         self.top = tk.Toplevel(parent)
         self.top.title(title)
-        self.top.geometry("450x280")
+        self.top.geometry("450x380")
         self.top.configure(bg="#0d1117")
         self.top.resizable(False, False)
         self.top.transient(parent)
@@ -71,8 +148,35 @@ class LoadingWindow:
             width=4, 
             smooth=True
         )
+        
+        # Progreso real leído de los logs del Office Deployment Tool
+        self.progress_var = tk.DoubleVar(value=0)
+        self.progressbar = ttk.Progressbar(
+            main_frame,
+            variable=self.progress_var,
+            maximum=100,
+            length=380,
+            mode="determinate"
+        )
+        self.progressbar.pack(pady=(15, 0))
+        
+        self.progress_label_var = tk.StringVar(value="Esperando el registro del instalador...")
+        self.progress_label = tk.Label(
+            main_frame,
+            textvariable=self.progress_label_var,
+            bg="#0d1117",
+            fg="#8b949e",
+            font=("Segoe UI", 9)
+        )
+        self.progress_label.pack(pady=(5, 0))
+        
+        # La ventana es modal: la cancelación tiene que estar aquí
+        if on_cancel:
+            self.cancel_button = ttk.Button(main_frame, text="⛔ Cancelar", command=on_cancel)
+            self.cancel_button.pack(pady=(12, 0))
 
         # Variables de animación mejoradas
+        self.wave_frames = wave_frames()
         self.frame = 0
         self.running = True
         self.color_cycle = itertools.cycle([
@@ -81,72 +185,76 @@ class LoadingWindow:
         self.current_color = next(self.color_cycle)
         self.dots = 0
 
-        # Iniciar animaciones
-        self.animate_wave()
-        self.animate_color()
-        self.animate_text()
+        # Iniciar animaciones en el reloj compartido
+        self.clock = AnimationClock.for_widget(self.canvas)
+        self.animation_tasks = [
+            self.clock.register(self.canvas, self.animate_wave, 25),
+            self.clock.register(self.canvas, self.animate_color, 1200),
+            self.clock.register(self.label, self.animate_text, 400),
+        ]
 
     def center_window(self):
         self.top.update_idletasks()
         x = (self.top.winfo_screenwidth() // 2) - (450 // 2)
-        y = (self.top.winfo_screenheight() // 2) - (280 // 2)
-        self.top.geometry(f"450x280+{x}+{y}")
+        y = (self.top.winfo_screenheight() // 2) - (380 // 2)
+        self.top.geometry(f"450x380+{x}+{y}")
 
     def create_gradient_bg(self):
-        # Simular gradiente con rectángulos
-        for i in range(120):
-            color_intensity = int(13 + (i / 120) * 10)
-            color = f"#{color_intensity:02x}{color_intensity+2:02x}{color_intensity+5:02x}"
-            self.canvas.create_line(0, i, 380, i, fill=color, width=1)
+        # Gradiente como una sola imagen en caché en lugar de 120 líneas
+        self.gradient = gradient_image(self.canvas, 380, 120, "#0d0f12", "#17191c")
+        self.canvas.create_image(0, 0, image=self.gradient, anchor="nw")
 
-    def animate_wave(self):
+    def animate_wave(self, frames=1):
         if not self.running:
             return
-        points = []
-        for x in range(0, 381, 8):
-            wave1 = 25 * math.sin((x + self.frame) * 0.04)
-            wave2 = 15 * math.sin((x + self.frame) * 0.06 + math.pi/3)
-            y = 60 + wave1 + wave2
-            points.extend([x, y])
-        
-        if len(points) >= 4:
-            self.canvas.coords(self.wave_line, *points)
-            self.canvas.itemconfig(self.wave_line, fill=self.current_color)
-        
-        self.frame += 6
-        self.top.after(25, self.animate_wave)
+        # Cuadro precalculado: una sola llamada a coords por tick
+        self.frame = (self.frame + frames) % WAVE_FRAME_COUNT
+        self.canvas.coords(self.wave_line, self.wave_frames[self.frame])
 
-    def animate_color(self):
+    def animate_color(self, frames=1):
         if not self.running:
             return
-        self.current_color = next(self.color_cycle)
-        self.top.after(1200, self.animate_color)
+        for _ in range(frames):
+            self.current_color = next(self.color_cycle)
+        # El color solo se escribe cuando cambia
+        self.canvas.itemconfig(self.wave_line, fill=self.current_color)
 
-    def animate_text(self):
+    def animate_text(self, frames=1):
         if not self.running:
             return
+        self.dots += frames
         dots = "●" * (self.dots % 4)
         spaces = "  " * (3 - (self.dots % 4))
         self.label_var.set(f"Instalando Office{dots}{spaces}")
-        self.dots += 1
-        self.top.after(400, self.animate_text)
+
+    def set_progress(self, progress):
+        self.progress_var.set(progress.percent)
+        self.progress_label_var.set(
+            f"{progress.phase} · {progress.percent:.0f}% · ETA {format_eta(progress.eta)}"
+        )
 
     def close(self):
         self.running = False
+        for task in self.animation_tasks:
+            self.clock.unregister(task)
         self.top.destroy()
 
 
 
 class OfficeInstallerApp:
-    def __init__(self, root):
+    def __init__(self, root, startup_trace=None, mirror_url=None):
         self.root = root
+        self.mirror_url = mirror_url
         self.root.title("Instalador Office LTSC Pro")
+        self.startup_trace = startup_trace or StartupTrace()
         
         # Configurar ventana responsiva
-        self.setup_responsive_window()
+        with self.startup_trace.span("setup_responsive_window"):
+            self.setup_responsive_window()
         
         # Configurar estilo moderno
-        self.setup_modern_styles()
+        with self.startup_trace.span("setup_modern_styles"):
+            self.setup_modern_styles()
         
         # Variables para almacenar las selecciones
         self.version_var = tk.StringVar(value="2021")
@@ -155,12 +263,77 @@ class OfficeInstallerApp:
         self.project_var = tk.BooleanVar(value=False)
         self.exclude_lync_var = tk.BooleanVar(value=True)
         self.language_var = tk.StringVar(value="en-us")
+        self.use_cache_var = tk.BooleanVar(value=False)
+        self.delta_var = tk.BooleanVar(value=True)
         
         self.is_loading = False
         self.loading_label = None
-        self.loading_thread = None
         
-        self.create_responsive_widgets()
+        # Cola del log: los hilos encolan y el hilo de Tk inserta por lotes
+        self.log_sink = LogSink()
+        
+        # Historial completo en disco; el widget solo muestra [inicio, fin)
+        self.log_store = LogStore()
+        
+        # Índice del historial: los filtros y búsquedas no recorren el widget
+        self.log_index = LogIndex()
+        self.log_filter = LogFilter()
+        self.log_filter_job = None
+        self.filter_matches = 0
+        self.filter_shown = 0
+        self.errors_only_var = tk.BooleanVar(value=False)
+        self.stderr_only_var = tk.BooleanVar(value=False)
+        self.search_var = tk.StringVar()
+        self.filter_status_var = tk.StringVar()
+        
+        # Registro persistente de la sesión (JSON Lines comprimido al cerrar)
+        try:
+            self.session_log = SessionLog().start()
+        except OSError:
+            self.session_log = None
+        self.log_view_start = 0
+        self.log_view_end = 0
+        self.log_paging = False
+        self.log_store_failed = False
+        
+        # Último progreso recibido del hilo de instalación, pendiente de mostrar
+        self.pending_progress = None
+        self.shown_progress = None
+        
+        # Trazador de la instalación en curso (NULL_TRACER si no hay ninguna)
+        self.run_tracer = NULL_TRACER
+        
+        # Resultados recientes de las verificaciones previas, por selección
+        self.preflight_cache = PreflightCache()
+        
+        # Cambios de tamaño pendientes; layout_skipped cuenta los recálculos evitados
+        self.layout_job = None
+        self.pending_canvas_width = None
+        self.applied_canvas_width = None
+        self.pending_scrollregion = False
+        self.layout_skipped = 0
+        
+        # Llamadas a widgets desde otros hilos, ejecutadas por lotes en el hilo de Tk
+        self.dispatcher = TkDispatcher(self.root).start()
+        
+        # Servidor local que recibe los lanzamientos posteriores (ver main)
+        self.instance_server = None
+        self.mirror_server = None
+        
+        # Trabajos en segundo plano: uno a la vez, en el orden en que se piden
+        self.jobs = JobExecutor(max_workers=1, on_change=self.on_job_change)
+        self.jobs_changed = False
+        
+        # Los hilos del ejecutor no son daemon: al cerrar la ventana hay que
+        # cancelar los trabajos y terminar setup.exe para que el proceso salga
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Con pythonw no hay consola: los errores de la interfaz van al log
+        self.root.report_callback_exception = self.report_callback_exception
+        
+        with self.startup_trace.span("create_responsive_widgets"):
+            self.create_responsive_widgets()
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
     
     def setup_responsive_window(self):
         # Obtener dimensiones de la pantalla
@@ -189,9 +362,11 @@ class OfficeInstallerApp:
         style = ttk.Style()
         
         # Tema moderno GitHub-inspired - cargar solo si existe
+        # (azure.tcl solo carga el tema activo; el otro se carga al cambiar)
         try:
-            if os.path.exists('azure.tcl'):
-                self.root.tk.call('source', 'azure.tcl')
+            azure_path = resource_path('azure.tcl')
+            if os.path.exists(azure_path):
+                self.root.tk.call('source', azure_path)
                 self.root.tk.call('set_theme', 'dark')
         except Exception:
             # Si falla, usar tema por defecto con colores personalizados
@@ -254,10 +429,7 @@ class OfficeInstallerApp:
         self.scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=self.main_canvas.yview)
         self.scrollable_frame = ttk.Frame(self.main_canvas, style='Custom.TFrame')
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.main_canvas.configure(scrollregion=self.main_canvas.bbox("all"))
-        )
+        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
         
         self.canvas_window = self.main_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
         self.main_canvas.configure(yscrollcommand=self.scrollbar.set)
@@ -286,9 +458,33 @@ class OfficeInstallerApp:
         # Botones modernos
         self.create_action_buttons(content_frame)
     
+    def on_frame_configure(self, event):
+        self.pending_scrollregion = True
+        self.schedule_layout()
+    
     def on_canvas_configure(self, event):
-        canvas_width = event.width
-        self.main_canvas.itemconfig(self.canvas_window, width=canvas_width)
+        self.pending_canvas_width = event.width
+        self.schedule_layout()
+    
+    def schedule_layout(self):
+        # Al arrastrar el borde llegan cientos de eventos: uno por cuadro basta
+        if self.layout_job is not None:
+            self.layout_skipped += 1
+            self.run_tracer.count("layout_skipped")
+            return
+        self.layout_job = self.root.after(LAYOUT_FRAME_MS, self.apply_layout)
+    
+    def apply_layout(self):
+        self.layout_job = None
+        width = self.pending_canvas_width
+        if width is not None and width != self.applied_canvas_width:
+            self.applied_canvas_width = width
+            self.main_canvas.itemconfig(self.canvas_window, width=width)
+        self.pending_canvas_width = None
+        
+        if self.pending_scrollregion:
+            self.pending_scrollregion = False
+            self.main_canvas.configure(scrollregion=self.main_canvas.bbox("all"))
     
     def on_mousewheel(self, event):
         self.main_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
@@ -359,7 +555,9 @@ class OfficeInstallerApp:
         components_list = [
             ("✏️ Visio Professional", self.visio_var),
             ("📊 Project Professional", self.project_var),
-            ("🚫 Excluir Skype for Business", self.exclude_lync_var)
+            ("🚫 Excluir Skype for Business", self.exclude_lync_var),
+            ("💾 Usar caché local de instalación", self.use_cache_var),
+            ("➕ Solo agregar lo que falta (sin desinstalar)", self.delta_var)
         ]
         
         for i, (text, var) in enumerate(components_list):
@@ -408,6 +606,25 @@ class OfficeInstallerApp:
             log_font = ('JetBrains Mono', 9)
         except:
             log_font = ('Courier New', 9)
+        
+        # Filtros y búsqueda sobre el índice del registro
+        filter_frame = ttk.Frame(log_card, style='Card.TFrame')
+        filter_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        for text, var in [("❌ Solo errores", self.errors_only_var), ("⚠️ Solo stderr", self.stderr_only_var)]:
+            ttk.Checkbutton(
+                filter_frame, text=text, variable=var, command=self.schedule_log_filter, style='Custom.TCheckbutton'
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(filter_frame, text="🔍", style='Custom.TLabel').pack(side=tk.LEFT)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        self.search_var.trace_add("write", lambda *args: self.schedule_log_filter())
+        
+        ttk.Label(
+            filter_frame, textvariable=self.filter_status_var, style='Custom.TLabel', font=self.small_font
+        ).pack(side=tk.RIGHT, padx=5)
             
         self.log_text = scrolledtext.ScrolledText(
             log_card,
@@ -425,6 +642,7 @@ class OfficeInstallerApp:
             highlightcolor=self.colors['border']
         )
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.log_text.configure(yscrollcommand=self.on_log_scroll)
         
         # Barra de estado moderna
         status_frame = ttk.Frame(log_card, style='Card.TFrame')
@@ -490,17 +708,248 @@ class OfficeInstallerApp:
             style='Custom.TButton'
         )
         clear_button.pack(side=tk.LEFT, padx=10)
+        
+        # Botón de cancelar: termina setup.exe y todos sus procesos
+        self.cancel_button = ttk.Button(
+            button_frame,
+            text="⛔ Cancelar",
+            command=self.cancel_jobs,
+            style='Custom.TButton',
+            state='disabled'
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=10)
+        
+        # Estado de los últimos trabajos
+        self.jobs_var = tk.StringVar(value="")
+        jobs_label = ttk.Label(button_container, textvariable=self.jobs_var, style='Custom.TLabel')
+        jobs_label.pack(pady=(10, 0))
+    
+    def log_message(self, message, stream="app", timestamp=None):
+        # Seguro desde cualquier hilo: solo encola el mensaje
+        self.log_sink.push(message, stream, timestamp)
+        if self.session_log:
+            # Con la cola llena solo esperan los hilos de trabajo, nunca el de Tk
+            block = threading.current_thread() is not threading.main_thread()
+            self.session_log.write(message, stream, timestamp, block)
+    
+    def report_callback_exception(self, exc_type, value, tb):
+        import traceback
+        
+        self.log_message(f"💥 Error en la interfaz: {value}")
+        self.log_message("".join(traceback.format_exception(exc_type, value, tb)).rstrip(), "stderr")
+    
+    def flush_log(self):
+        records = []
+        try:
+            records = self.log_sink.drain(LOG_BATCH_MAX)
+            if records:
+                self.show_records(records)
+            
+            progress = self.pending_progress
+            if progress is not None and progress is not self.shown_progress and getattr(self, "loading_popup", None):
+                if self.loading_popup.running:
+                    self.loading_popup.set_progress(progress)
+                self.shown_progress = progress
+            
+            if self.jobs_changed:
+                self.jobs_changed = False
+                self.refresh_jobs()
+        finally:
+            # Un error en un lote no debe detener el vaciado del log
+            # Si quedó cola pendiente, volver a vaciar en el siguiente ciclo
+            delay = 1 if len(records) == LOG_BATCH_MAX else LOG_FLUSH_MS
+            self.root.after(delay, self.flush_log)
+    
+    def show_records(self, records):
+        flush_start = time.perf_counter()
+        lines = []
+        offsets = []
+        for record in records:
+            offsets.append(len(lines))
+            lines.extend(format_record(record).split("\n"))
+        
+        # Sin historial en disco la vista siempre sigue el final
+        following = self.log_store_failed or self.log_view_end == self.log_store.total
+        batch_start = self.log_store.total
+        try:
+            self.log_store.append(lines)
+        except OSError as e:
+            # Disco lleno: el lote se muestra igual aunque no quede en el historial
+            if not self.log_store_failed:
+                lines.insert(0, f"⚠️ No se pudo guardar el historial del log: {e}")
+            self.log_store_failed = True
+            if following and not any(self.log_filter):
+                self.log_text.configure(state='normal')
+                self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+                # Los números del almacén ya no valen: se acota por las líneas del widget
+                excess = int(self.log_text.index("end - 1 chars").split(".")[0]) - 1 - LOG_MAX_LINES
+                if excess > 0:
+                    self.log_text.delete("1.0", f"{excess + 1}.0")
+                self.log_text.see(tk.END)
+                self.log_text.configure(state='disabled')
+            self.update_status(records[-1].text)
+            return
+        recovered = self.log_store_failed
+        self.log_store_failed = False
+        
+        for offset, record in zip(offsets, records):
+            self.log_index.add(batch_start + offset, record)
+        self.log_index.discard_before(self.log_store.first_available)
+        
+        if any(self.log_filter):
+            self.append_filtered(batch_start)
+        elif recovered:
+            # El widget dejó de corresponder al almacén: se recarga el final
+            self.reload_log_tail()
+        # Solo se inserta si la vista sigue el final del log
+        elif following:
+            self.log_text.configure(state='normal')
+            # Una sola inserción por lote en lugar de una por línea
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_view_end = self.log_store.total
+            self.trim_log_view(from_top=True)
+            self.log_text.see(tk.END)
+            self.log_text.configure(state='disabled')
+        self.update_status(records[-1].text)
+        
+        # Latencia desde que se leyó cada línea hasta que se mostró
+        tracer = self.run_tracer
+        if tracer.enabled:
+            now = time.time()
+            for record in records:
+                tracer.observe("ui_latency_s", now - record.timestamp)
+            tracer.observe("ui_flush_s", time.perf_counter() - flush_start)
+    
+    def on_job_change(self, job):
+        # Llega desde el hilo del trabajo: el hilo de Tk lo muestra en flush_log
+        self.jobs_changed = True
+    
+    def refresh_jobs(self):
+        jobs = self.jobs.jobs()
+        self.jobs_var.set("   ".join(job.describe() for job in jobs[-3:]))
+        active = any(job.state in ("queued", "running") for job in jobs)
+        self.cancel_button.config(state="normal" if active else "disabled")
+    
+    def cancel_jobs(self):
+        if self.jobs.active():
+            self.log_message("⛔ Cancelando la operación en curso...")
+            self.jobs.cancel_all()
+    
+    def trim_log_view(self, from_top):
+        # Mantener el widget acotado a LOG_MAX_LINES líneas
+        excess = (self.log_view_end - self.log_view_start) - LOG_MAX_LINES
+        if excess <= 0:
+            return
+        if from_top:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_view_start += excess
+        else:
+            self.log_text.delete(f"end - {excess + 1} lines", "end - 1 chars")
+            self.log_view_end -= excess
+    
+    def on_log_scroll(self, first, last):
+        self.log_text.vbar.set(first, last)
+        # Con un filtro activo el widget muestra coincidencias, no un rango contiguo,
+        # y si el almacén falla sus números no corresponden al widget
+        if self.log_paging or any(self.log_filter) or self.log_store_failed:
+            return
+        # Al llegar a un extremo, cargar la página contigua desde disco
+        if float(first) <= 0.0 and self.log_view_start > self.log_store.first_available:
+            self.log_paging = True
+            self.root.after_idle(self.page_log, -1)
+        elif float(last) >= 1.0 and self.log_view_end < self.log_store.total:
+            self.log_paging = True
+            self.root.after_idle(self.page_log, 1)
     
-    def log_message(self, message):
+    def page_log(self, direction):
+        top_line = int(self.log_text.index("@0,0").split(".")[0])
         self.log_text.configure(state='normal')
-        # Agregar timestamp y formateo
-        timestamp = time.strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-        self.log_text.insert(tk.END, formatted_message + "\n")
+        if direction < 0:
+            start = max(self.log_view_start - LOG_PAGE_LINES, self.log_store.first_available)
+            lines = self.log_store.read(start, self.log_view_start)
+            self.log_text.insert("1.0", "\n".join(lines) + "\n")
+            self.log_view_start = start
+            self.trim_log_view(from_top=False)
+            top_line += len(lines)
+        else:
+            end = min(self.log_view_end + LOG_PAGE_LINES, self.log_store.total)
+            lines = self.log_store.read(self.log_view_end, end)
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_view_end = end
+            before = self.log_view_start
+            self.trim_log_view(from_top=True)
+            top_line -= self.log_view_start - before
+        self.log_text.configure(state='disabled')
+        
+        # Conservar la línea que el usuario estaba viendo
+        self.log_text.yview(f"{max(top_line, 1)}.0")
+        self.log_paging = False
+    
+    def schedule_log_filter(self):
+        if self.log_filter_job is not None:
+            self.root.after_cancel(self.log_filter_job)
+        self.log_filter_job = self.root.after(LOG_FILTER_DELAY_MS, self.apply_log_filter)
+    
+    def apply_log_filter(self):
+        self.log_filter_job = None
+        log_filter = LogFilter(
+            frozenset({"error"}) if self.errors_only_var.get() else frozenset(),
+            frozenset({"stderr"}) if self.stderr_only_var.get() else frozenset(),
+            self.search_var.get().strip()
+        )
+        try:
+            matches = self.log_index.search(log_filter, self.log_store) if any(log_filter) else None
+        except re.error:
+            self.filter_status_var.set("⚠️ Expresión no válida")
+            return
+        self.log_filter = log_filter
+        
+        if matches is None:
+            # Sin filtro: volver a seguir el final del log
+            self.filter_status_var.set("")
+            self.reload_log_tail()
+            return
+        
+        # Solo se muestran las coincidencias más recientes
+        lines = [line for _, line in self.log_store.read_lines(matches[-LOG_MAX_LINES:])]
+        self.filter_matches = len(matches)
+        self.filter_shown = len(lines)
+        self.filter_status_var.set(f"🔍 {self.filter_matches} coincidencias")
+        self.show_log_lines(lines)
+    
+    def reload_log_tail(self):
+        self.log_view_end = self.log_store.total
+        self.log_view_start = max(self.log_view_end - LOG_MAX_LINES, self.log_store.first_available)
+        self.show_log_lines(self.log_store.read(self.log_view_start, self.log_view_end))
+    
+    def show_log_lines(self, lines):
+        self.log_text.configure(state='normal')
+        self.log_text.delete(1.0, tk.END)
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
         self.log_text.see(tk.END)
         self.log_text.configure(state='disabled')
-        self.update_status(message)
-        self.root.update()
+    
+    def append_filtered(self, start):
+        # Solo se comprueban las líneas nuevas del lote
+        matches = self.log_index.search(self.log_filter, self.log_store, start)
+        if not matches:
+            return
+        self.filter_matches += len(matches)
+        self.filter_status_var.set(f"🔍 {self.filter_matches} coincidencias")
+        
+        lines = [line for _, line in self.log_store.read_lines(matches[-LOG_MAX_LINES:])]
+        following = self.log_text.yview()[1] >= 1.0
+        self.log_text.configure(state='normal')
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        self.filter_shown += len(lines)
+        excess = self.filter_shown - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.filter_shown -= excess
+        if following:
+            self.log_text.see(tk.END)
+        self.log_text.configure(state='disabled')
     
     def update_status(self, message):
         # Limpiar mensaje para estado
@@ -509,18 +958,25 @@ class OfficeInstallerApp:
         self.status_label.config(text=display_message)
     
     def clear_log(self):
+        # Descartar también los mensajes pendientes en la cola
+        self.log_sink.clear()
+        self.log_store.reset()
+        self.log_index.reset()
+        self.log_view_start = 0
+        self.log_view_end = 0
+        self.filter_matches = 0
+        self.filter_shown = 0
+        if any(self.log_filter):
+            self.filter_status_var.set("🔍 0 coincidencias")
         self.log_text.configure(state='normal')
         self.log_text.delete(1.0, tk.END)
         self.log_text.configure(state='disabled')
         self.update_status("Listo para instalar Office LTSC")
     
     def is_admin(self):
-        try:
-            return ctypes.windll.shell32.IsUserAnAdmin()
-        except:
-            return False
+        return instalador.is_admin()
     
-    def run_as_admin(self):
+    def run_as_admin(self, operation=None):
         if not self.is_admin():
             try:
                 # Usar pythonw.exe para ejecutar sin mostrar terminal
@@ -530,8 +986,10 @@ class OfficeInstallerApp:
                     if os.path.exists(pythonw_exe):
                         python_exe = pythonw_exe
                 
-                # Crear argumentos para el reinicio
-                args = ' '.join([f'"{arg}"' for arg in sys.argv])
+                # Crear argumentos para el reinicio, con la operación pendiente
+                handoff_path = write_handoff(operation, self.export_state())
+                argv = strip_handoff(sys.argv) + [f"{HANDOFF_FLAG}={handoff_path}"]
+                args = ' '.join([f'"{arg}"' for arg in argv])
                 
                 # Ejecutar directamente sin script temporal
                 result = ctypes.windll.shell32.ShellExecuteW(
@@ -539,8 +997,8 @@ class OfficeInstallerApp:
                 )
                 
                 if result > 32:  # Éxito
-                    # Cerrar el programa actual de manera ordenada
-                    self.root.after(500, self._close_program)
+                    # El nuevo proceso ya tiene todo lo necesario: cerrar enseguida
+                    self.root.after_idle(self._close_program)
                     return True
                 else:
                     # Error al iniciar como admin
@@ -559,9 +1017,29 @@ class OfficeInstallerApp:
                 return False
         return True
     
+    def on_close(self):
+        # Terminar los procesos hijos antes de cerrar la ventana
+        self.jobs.shutdown(cancel=True)
+        # El trabajo cancelado registra su final antes de cerrar el log de la sesión
+        self.jobs.wait(timeout=2)
+        self._close_program()
+    
     def _close_program(self):
         """Cerrar el programa de manera ordenada"""
+        # Borrar los segmentos del log en %TEMP% aunque falle otro paso
+        try:
+            self.log_store.close()
+        except OSError:
+            pass
+        # Escribir lo pendiente y comprimir la sesión: el hilo escritor es daemon
+        if self.session_log:
+            try:
+                self.session_log.close()
+            except OSError:
+                pass
         try:
+            if self.instance_server:
+                self.instance_server.stop()
             self.root.quit()
             self.root.destroy()
         except:
@@ -569,58 +1047,134 @@ class OfficeInstallerApp:
         finally:
             os._exit(0)
     
-    def generate_config_xml(self):
-        version = self.version_var.get()
-        architecture = self.architecture_var.get()
-        language = self.language_var.get()
-        
-        config_file = "configuration.xml"
-        
-        xml_content = f"""<Configuration>
-    <Add OfficeClientEdition="{architecture}" Channel="PerpetualVL{version if version in ['2019', '2021'] else ''}">
-        <Product ID="ProPlus{version if version in ['2019', '2021'] else ''}Volume">
-            <Language ID="{language}"/>"""
-        
-        if self.exclude_lync_var.get():
-            xml_content += "\n            <ExcludeApp ID=\"Lync\"/>"
-        
-        xml_content += "\n        </Product>"
-        
-        if self.visio_var.get():
-            xml_content += f"""
-        <Product ID="VisioPro{version if version in ['2019', '2021'] else ''}Volume">
-            <Language ID="{language}"/>
-        </Product>"""
-        
-        if self.project_var.get():
-            xml_content += f"""
-        <Product ID="ProjectPro{version if version in ['2019', '2021'] else ''}Volume">
-            <Language ID="{language}"/>
-        </Product>"""
+    def selection_vars(self):
+        return {
+            "version": self.version_var,
+            "architecture": self.architecture_var,
+            "language": self.language_var,
+            "visio": self.visio_var,
+            "project": self.project_var,
+            "exclude_lync": self.exclude_lync_var,
+            "use_cache": self.use_cache_var,
+            "delta": self.delta_var,
+        }
+    
+    def export_state(self):
+        return {name: var.get() for name, var in self.selection_vars().items()}
+    
+    def apply_state(self, state):
+        for name, var in self.selection_vars().items():
+            if name in state:
+                var.set(state[name])
+    
+    def resume_handoff(self, handoff):
+        """Restaura la selección recibida y retoma la operación pendiente."""
+        self.apply_state(handoff.get("selection", {}))
+        operation = {"install": self.start_installation, "activate": self.start_activation}.get(
+            handoff.get("operation")
+        )
+        if operation:
+            self.log_message("⚡ Continuando con permisos de administrador...")
+            self.root.after_idle(operation)
+    
+    def on_forwarded_request(self, request):
+        # Otro lanzamiento del programa: se usa esta ventana en lugar de abrir otra
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+        self.log_message("🔁 El instalador ya estaba abierto: se usa esta ventana")
+        # Sus opciones no se aplican: cualquier proceso del usuario puede leer
+        # el token y esta ventana puede estar elevada (el espejo sería el
+        # origen de setup.exe o abriría un servidor en la red)
+        if any(arg.startswith("--") for arg in request.get("argv", [])):
+            self.log_message("⚠️ Se ignoraron las opciones del nuevo lanzamiento: cierra esta ventana para usarlas")
+    
+    def apply_launch_options(self, argv):
+        """Aplica las opciones de red de la línea de comandos de este proceso."""
+        # --serve-mirror[=puerto] comparte la caché local y
+        # --mirror=http://equipo:puerto instala desde la de otro equipo
+        for arg in argv:
+            if arg.startswith("--mirror="):
+                url = arg.split("=", 1)[1]
+                if not is_mirror_url(url):
+                    self.log_message(f"❌ Espejo no válido (se esperaba http://equipo:puerto): {url}")
+                    continue
+                self.mirror_url = url
+                self.log_message(f"🌐 Las instalaciones usarán el espejo {self.mirror_url}")
+            elif arg == "--serve-mirror" or arg.startswith("--serve-mirror="):
+                try:
+                    port = int(arg.split("=", 1)[1]) if "=" in arg else MIRROR_PORT
+                except ValueError:
+                    self.log_message(f"❌ Puerto del espejo no válido: {arg}")
+                    continue
+                self.start_mirror(port)
+    
+    def start_mirror(self, port):
+        if self.mirror_server is not None:
+            self.log_message(f"🌐 El espejo de orígenes ya está activo en el puerto {self.mirror_server.port}")
+            return
+        # http.server y sus dependencias solo se cargan si se pide el espejo
+        from espejo import MirrorServer
         
-        xml_content += """
-    </Add>
-    <Remove All="True"/>
-    <Display Level="None" AcceptEULA="TRUE" />
-    <Property Name="AUTOACTIVATE" Value="1" />
-</Configuration>"""
+        try:
+            self.mirror_server = MirrorServer(SourceCache().root, port=port, log=self.log_message).start()
+            self.log_message(f"🌐 Espejo de orígenes activo en el puerto {self.mirror_server.port}")
+        except OSError as e:
+            self.log_message(f"❌ No se pudo iniciar el espejo: {e}")
+    
+    def current_selection(self):
+        """Copia de la selección actual; solo desde el hilo de Tk."""
+        return Selection(
+            self.version_var.get(),
+            self.architecture_var.get(),
+            self.language_var.get(),
+            self.visio_var.get(),
+            self.project_var.get(),
+            self.exclude_lync_var.get()
+        )
+    
+    def generate_config_xml(self, source_path=None, plan=None, selection=None):
+        selection = selection or self.current_selection()
+        if plan and plan.mode == "delta":
+            xml_content = instalador.build_delta_xml(
+                selection.version,
+                selection.architecture,
+                plan.add,
+                exclude_lync=selection.exclude_lync,
+                source_path=source_path
+            )
+            return instalador.CONFIG_FILE, xml_content
         
-        return config_file, xml_content
+        # La selección ya es la clave de la memoria de XML: no se vuelve a armar
+        if source_path != selection.source_path:
+            selection = selection._replace(source_path=source_path)
+        return instalador.CONFIG_FILE, render_selection(selection)
     
     def start_loading_animation(self, action):
+        # Temporizador de Tk en lugar de un hilo dormido por cada clic
         self.is_loading = True
-        dots = 0
-        base_text = f"{action}..."
-        while self.is_loading:
-            text = base_text + "." * dots
-            self.update_status(text)
-            dots = (dots + 1) % 4
-            time.sleep(0.5)
+        self.animate_loading_status(f"{action}...", 0)
+    
+    def animate_loading_status(self, base_text, dots):
+        if not self.is_loading:
+            return
+        self.update_status(base_text + "." * dots)
+        self.root.after(500, self.animate_loading_status, base_text, (dots + 1) % 4)
     
     def stop_loading_animation(self):
         self.is_loading = False
         self.update_status("Operación completada")
     
+    def end_operation(self):
+        self.stop_loading_animation()
+        self.toggle_buttons(True)
+    
+    def close_loading_popup(self):
+        popup = getattr(self, "loading_popup", None)
+        if popup is not None:
+            self.loading_popup = None
+            popup.close()
+    
     def toggle_buttons(self, state):
         state = "normal" if state else "disabled"
         self.install_button.config(state=state)
@@ -632,89 +1186,184 @@ class OfficeInstallerApp:
                 "🔐 Permisos de Administrador", 
                 "Este programa necesita permisos de administrador para instalar Office.\n\n"
                 "¿Deseas reiniciar el programa con permisos de administrador?\n\n"
-                "NOTA: El programa se cerrará y se abrirá una nueva ventana con permisos de administrador."
+                "NOTA: Se abrirá una nueva ventana con permisos de administrador que continuará con tu selección."
             )
             if result:
                 self.log_message("🔄 Reiniciando con permisos de administrador...")
-                self.log_message("⏳ Cerrando programa actual...")
                 
                 # Deshabilitar botones y mostrar estado
                 self.toggle_buttons(False)
                 self.update_status("Reiniciando con permisos de administrador...")
                 
-                # Ejecutar después de un pequeño delay para que el usuario vea el mensaje
-                self.root.after(1000, lambda: self.run_as_admin())
+                # La nueva ventana recibe la selección y continúa con la operación
+                if not self.run_as_admin("install"):
+                    self.toggle_buttons(True)
                 return
             else:
                 self.log_message("❌ Instalación cancelada - Se requieren permisos de administrador")
                 return
         
         # Esta parte solo se ejecuta si ya tenemos permisos de admin
+        plan = None
+        if self.delta_var.get():
+            # Mostrar el cambio planificado antes de ejecutar nada
+            plan = instalador.plan_selection(
+                self.version_var.get(),
+                self.architecture_var.get(),
+                self.language_var.get(),
+                self.visio_var.get(),
+                self.project_var.get(),
+                self.exclude_lync_var.get()
+            )
+            if plan.mode == "none":
+                # Nada que agregar: se ofrece reinstalar todo para reparar Office
+                if not messagebox.askyesno(
+                    "✅ Nada que instalar",
+                    describe_plan(plan) + "\n\n¿Reinstalar Office de todos modos para repararlo?"
+                ):
+                    return
+                plan = None
+            elif not messagebox.askyesno("📋 Cambios planificados", describe_plan(plan) + "\n\n¿Continuar?"):
+                self.log_message("❌ Instalación cancelada por el usuario")
+                return
+        
         self.clear_log()
         self.log_message("🔧 Preparando instalación de Office LTSC...")
+        if plan:
+            for line in describe_plan(plan).splitlines():
+                self.log_message(line)
         self.toggle_buttons(False)
 
         # Mostrar ventana de carga mejorada
-        self.loading_popup = LoadingWindow(self.root, title="Instalando Office LTSC")
+        self.loading_popup = LoadingWindow(self.root, title="Instalando Office LTSC", on_cancel=self.cancel_jobs)
         
-        threading.Thread(target=self.install_office, daemon=True).start()
+        # La selección se lee aquí, en el hilo de Tk, y los trabajos reciben una copia
+        selection = self.current_selection()
+        use_cache = self.use_cache_var.get()
+        tracer = self.run_tracer = self.dispatcher.tracer = Tracer("install")
+        # El progreso de una instalación anterior no debe aparecer en la nueva ventana
+        self.pending_progress = self.shown_progress = None
+        
+        # Verificar, preparar el origen e instalar: cada paso espera al anterior
+        source = verify = self.jobs.submit(
+            "verify",
+            lambda job: self.verify_installation(plan, selection, tracer),
+            label="Verificar requisitos"
+        )
+        if self.mirror_url or use_cache:
+            source = self.jobs.submit(
+                "stage_source",
+                lambda job: self.prepare_source(selection, tracer, job),
+                label="Preparar origen",
+                after=verify
+            )
+        self.jobs.submit(
+            "install",
+            lambda job: self.install_office(plan, selection, source, tracer, job),
+            label="Instalar Office",
+            after=source,
+            on_finish=lambda job: self.finish_installation(job, selection, tracer)
+        )
     
-    def install_office(self):
-        try:
-            config_file, xml_content = self.generate_config_xml()
-            
-            with open(config_file, "w", encoding="utf-8") as f:
-                f.write(xml_content)
-            
-            self.log_message(f"✅ Archivo de configuración generado: {config_file}")
-            
-            setup_path = os.path.join(os.path.dirname(sys.argv[0]), "setup.exe")
-            if not os.path.exists(setup_path):
-                setup_path = "setup.exe"
-                if not os.path.exists(setup_path):
-                    self.log_message("❌ Error: No se encontró setup.exe")
-                    self.stop_loading_animation()
-                    self.toggle_buttons(True)
-                    return
-            
-            self.log_message("🚀 Iniciando instalación de Office LTSC...")
-            
-            process = subprocess.Popen(
-                [setup_path, "/configure", config_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
+    def verify_installation(self, plan, selection, tracer):
+        # Hilo del trabajo: los widgets solo se tocan a través del despachador
+        if self.session_log:
+            self.session_log.phase = "Verificando"
+        passed, results = instalador.preflight(
+            selection.version,
+            selection.architecture,
+            selection.language,
+            self.log_message,
+            plan,
+            self.preflight_cache,
+            tracer
+        )
+        if not passed:
+            self.dispatcher.post(messagebox.showerror, "❌ Verificaciones previas", summarize(results))
+            raise JobFailed("Verificaciones previas no superadas")
+    
+    def prepare_source(self, selection, tracer, job):
+        if self.mirror_url:
+            # Origen compartido por el espejo HTTP de otro equipo
+            source_path = instalador.mirror_source(
+                self.mirror_url,
+                selection.version,
+                selection.architecture,
+                [selection.language]
             )
-            
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.log_message(f"📄 {output.strip()}")
-            
-            return_code = process.poll()
-            self.stop_loading_animation()
-            self.toggle_buttons(True)
-            
-            if return_code == 0:
-                self.log_message("🎉 ¡Instalación completada con éxito!")
-                messagebox.showinfo("✅ Éxito", "Office LTSC se instaló correctamente.")
-            else:
-                error_msg = process.stderr.read()
-                self.log_message(f"❌ Error durante la instalación (Código {return_code}): {error_msg}")
-                messagebox.showerror("❌ Error", f"Error durante la instalación:\n{error_msg}")
-                
-        except Exception as e:
-            self.stop_loading_animation()
-            self.toggle_buttons(True)
-            self.log_message(f"💥 Error inesperado: {str(e)}")
-            messagebox.showerror("💥 Error", f"Error inesperado:\n{str(e)}")
-
-        finally:
-            if hasattr(self, "loading_popup"):
-                self.loading_popup.close()
+            self.log_message(f"🌐 Usando origen del espejo: {source_path}")
+            return source_path
+        
+        # Descargar una sola vez y reutilizar el origen local
+        source_path = instalador.stage_source(
+            SourceCache(),
+            selection.version,
+            selection.architecture,
+            [selection.language],
+            self.log_message,
+            tracer,
+            job
+        )
+        job.check_cancelled()
+        if source_path is None:
+            raise JobFailed("No se pudo preparar el origen")
+        return source_path
+    
+    def install_office(self, plan, selection, source, tracer, job=None):
+        ui = self.dispatcher.post
+        source_path = source.result if source.kind == "stage_source" else None
+        with tracer.span("config_generation"):
+            config_file, xml_content = self.generate_config_xml(source_path, plan, selection)
+        return_code, error_msg = instalador.install_office(
+            config_file, xml_content, self.log_message, self.on_progress, tracer, job
+        )
+        
+        if job and job.cancel_requested:
+            return return_code
+        if return_code == 0:
+            self.log_message("🎉 ¡Instalación completada con éxito!")
+            ui(messagebox.showinfo, "✅ Éxito", "Office LTSC se instaló correctamente.")
+        elif return_code is not None:
+            self.log_message(f"❌ Error durante la instalación (Código {return_code}): {error_msg}")
+            ui(messagebox.showerror, "❌ Error", f"Error durante la instalación:\n{error_msg}")
+        return return_code
+    
+    def finish_installation(self, job, selection, tracer):
+        # Se llama una vez al terminar la cadena, desde el hilo que la cerró
+        ui = self.dispatcher.post
+        chain = []
+        step = job
+        while step is not None:
+            chain.append(step)
+            step = step.after
+        failed = next((step for step in chain if step.state == FAILED), None)
+        
+        if any(step.cancel_requested for step in chain):
+            self.log_message("⛔ Instalación cancelada")
+        elif failed is not None and not isinstance(failed.error, JobFailed):
+            self.log_message(f"💥 Error inesperado: {str(failed.error)}")
+            ui(messagebox.showerror, "💥 Error", f"Error inesperado:\n{str(failed.error)}")
+        
+        ui(self.end_operation)
+        ui(self.close_loading_popup)
+        self.run_tracer = self.dispatcher.tracer = NULL_TRACER
+        if self.session_log:
+            self.session_log.phase = None
+        tracer.finish(
+            return_code=job.result if job.state == DONE else None, mode="gui",
+            version=selection.version,
+            architecture=selection.architecture,
+            language=selection.language,
+            layout_skipped_total=self.layout_skipped,
+            ui_dispatch=self.dispatcher.stats(),
+            session_log=self.session_log.archive_path if self.session_log else None
+        )
+    
+    def on_progress(self, progress):
+        # Llamado desde el hilo del monitor: se muestra en el próximo flush_log
+        self.pending_progress = progress
+        if self.session_log:
+            self.session_log.phase = progress.phase
     
     def start_activation(self):
         if not self.is_admin():
@@ -722,18 +1371,18 @@ class OfficeInstallerApp:
                 "🔐 Permisos de Administrador", 
                 "Este programa necesita permisos de administrador para activar Office.\n\n"
                 "¿Deseas reiniciar el programa con permisos de administrador?\n\n"
-                "NOTA: El programa se cerrará y se abrirá una nueva ventana con permisos de administrador."
+                "NOTA: Se abrirá una nueva ventana con permisos de administrador que continuará con tu selección."
             )
             if result:
                 self.log_message("🔄 Reiniciando con permisos de administrador...")
-                self.log_message("⏳ Cerrando programa actual...")
                 
                 # Deshabilitar botones y mostrar estado
                 self.toggle_buttons(False)
                 self.update_status("Reiniciando con permisos de administrador...")
                 
-                # Ejecutar después de un pequeño delay para que el usuario vea el mensaje
-                self.root.after(1000, lambda: self.run_as_admin())
+                # La nueva ventana recibe la selección y continúa con la operación
+                if not self.run_as_admin("activate"):
+                    self.toggle_buttons(True)
                 return
             else:
                 self.log_message("❌ Activación cancelada - Se requieren permisos de administrador")
@@ -743,14 +1392,14 @@ class OfficeInstallerApp:
         self.clear_log()
         self.log_message("🔐 Preparando activación de Office...")
         self.toggle_buttons(False)
-        self.loading_thread = threading.Thread(target=self.start_loading_animation, args=("Activando Office",), daemon=True)
-        self.loading_thread.start()
-        threading.Thread(target=self.activate_office, daemon=True).start()
+        self.start_loading_animation("Activando Office")
+        version = self.version_var.get()
+        self.jobs.submit("activate", lambda job: self.activate_office(version, job), label="Activar Office")
     
-    def activate_office(self):
+    def activate_office(self, version, job=None):
+        # Hilo del trabajo: los widgets solo se tocan a través del despachador
+        ui = self.dispatcher.post
         try:
-            version = self.version_var.get()
-            
             kms_keys = {
                 "2019": "NMMKJ-6RK4F-KMJVX-8D9MJ-6MWKP",
                 "2021": "FXYTK-NJJ8C-GB6DW-3DYQT-6F7TH",
@@ -800,6 +1449,9 @@ cscript ospp.vbs /act
 
 echo Proceso de activación completado
 """
+            # Módulo que no hace falta para el primer pintado
+            import tempfile
+            
             temp_dir = tempfile.gettempdir()
             batch_path = os.path.join(temp_dir, "activate_office.bat")
             
@@ -808,48 +1460,71 @@ echo Proceso de activación completado
             
             self.log_message("🔧 Ejecutando script de activación...")
             
-            process = subprocess.Popen(
-                ['cmd.exe', '/c', batch_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.log_message(f"📄 {output.strip()}")
+            return_code, error_msg = instalador.run_logged(['cmd.exe', '/c', batch_path], self.log_message, job=job)
+            ui(self.end_operation)
             
-            return_code = process.poll()
-            self.stop_loading_animation()
-            self.toggle_buttons(True)
+            if job and job.cancel_requested:
+                self.log_message("⛔ Activación cancelada")
+                return
             
             if return_code == 0:
                 self.log_message("🎉 ¡Activación completada con éxito!")
-                messagebox.showinfo("✅ Éxito", "Office se activó correctamente.")
+                ui(messagebox.showinfo, "✅ Éxito", "Office se activó correctamente.")
             else:
-                error_msg = process.stderr.read()
                 self.log_message(f"❌ Error durante la activación (Código {return_code}): {error_msg}")
-                messagebox.showerror("❌ Error", f"Error durante la activación:\n{error_msg}")
+                ui(messagebox.showerror, "❌ Error", f"Error durante la activación:\n{error_msg}")
             
         except Exception as e:
-            self.stop_loading_animation()
-            self.toggle_buttons(True)
+            ui(self.end_operation)
             self.log_message(f"💥 Error inesperado: {str(e)}")
-            messagebox.showerror("💥 Error", f"Error inesperado:\n{str(e)}")
+            ui(messagebox.showerror, "💥 Error", f"Error inesperado:\n{str(e)}")
+
+def watch_first_paint(root, startup_trace):
+    # El primer Expose de la ventana principal, una vez redibujada, cierra la traza
+    def on_expose(event):
+        if event.widget is root and not startup_trace.written:
+            root.after_idle(finish)
+    
+    def finish():
+        startup_trace.record("first_paint", paint_start, time.perf_counter())
+        startup_trace.write()
+    
+    paint_start = time.perf_counter()
+    root.bind("<Expose>", on_expose, add="+")
+
 
 def main():
-    root = tk.Tk()
+    startup_trace = StartupTrace.from_environment(sys.argv, start=STARTUP_T0)
+    startup_trace.record("imports", STARTUP_T0, time.perf_counter())
+    
+    # Reinicio elevado: retoma la operación; si no, otra instancia abierta atiende la petición
+    handoff = read_handoff(sys.argv)
+    if handoff is None and forward_to_running(strip_handoff(sys.argv[1:])):
+        return
+    
+    with startup_trace.span("tk_root"):
+        root = tk.Tk()
     
     try:
         root.iconbitmap(resource_path("icono.ico"))
     except:
         pass
     
-    app = OfficeInstallerApp(root)
+    app = OfficeInstallerApp(root, startup_trace)
+    
+    try:
+        app.instance_server = InstanceServer(
+            lambda request: app.dispatcher.post(app.on_forwarded_request, request)
+        ).start()
+    except OSError:
+        pass
+    # Las mismas opciones que atiende on_forwarded_request en una ventana ya abierta
+    app.apply_launch_options(strip_handoff(sys.argv[1:]))
+    if handoff:
+        app.resume_handoff(handoff)
+    
+    if startup_trace.enabled:
+        watch_first_paint(root, startup_trace)
     root.mainloop()
 
 if __name__ == "__main__":
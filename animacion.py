@@ -1,5 +1,160 @@
 import tkinter as tk
 import math
+import time
+from functools import lru_cache
+
+
+class AnimationClock:
+    """Reloj único de animación compartido por todas las ventanas de una raíz.
+
+    Cada animación se registra con su intervalo y recibe en cada llamada el
+    número de cuadros transcurridos según el tiempo real, de modo que si el
+    bucle de Tk se retrasa se saltan cuadros en lugar de acumularlos. Las
+    animaciones de ventanas minimizadas u ocultas se suspenden y, si no queda
+    ninguna visible, el reloj deja de programar ticks.
+    """
+
+    # Retraso máximo recuperable antes de resincronizar una animación
+    MAX_SKIP_FRAMES = 10
+
+    def __init__(self, root):
+        self.root = root
+        self.tasks = []
+        self.bound_toplevels = set()
+        self.after_id = None
+
+    @classmethod
+    def for_widget(cls, widget):
+        root = widget._root()
+        clock = getattr(root, "_animation_clock", None)
+        if clock is None:
+            clock = cls(root)
+            root._animation_clock = clock
+        return clock
+
+    def register(self, widget, callback, interval_ms):
+        toplevel = widget.winfo_toplevel()
+        task = {
+            "widget": widget,
+            "toplevel": toplevel,
+            "callback": callback,
+            "interval": interval_ms / 1000.0,
+            "due": time.monotonic(),
+            "mapped": True,
+            "obscured": False,
+        }
+        self.tasks.append(task)
+
+        if toplevel not in self.bound_toplevels:
+            self.bound_toplevels.add(toplevel)
+            toplevel.bind("<Map>", lambda e, t=toplevel: self.on_map(e, t, True), add="+")
+            toplevel.bind("<Unmap>", lambda e, t=toplevel: self.on_map(e, t, False), add="+")
+        widget.bind("<Visibility>", lambda e, w=widget: self.on_visibility(e, w), add="+")
+        widget.bind("<Destroy>", lambda e, w=widget: self.on_destroy(e, w), add="+")
+
+        self.schedule()
+        return task
+
+    def unregister(self, task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+        if not self.tasks and self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def is_visible(self, task):
+        return task["mapped"] and not task["obscured"]
+
+    def on_map(self, event, toplevel, mapped):
+        # Los eventos de los hijos también llegan a la ventana principal
+        if event.widget is not toplevel:
+            return
+        for task in self.tasks:
+            if task["toplevel"] is toplevel:
+                task["mapped"] = mapped
+                task["due"] = time.monotonic()
+        self.schedule()
+
+    def on_visibility(self, event, widget):
+        obscured = event.state == "VisibilityFullyObscured"
+        for task in self.tasks:
+            if task["widget"] is widget:
+                task["obscured"] = obscured
+                task["due"] = time.monotonic()
+        self.schedule()
+
+    def on_destroy(self, event, widget):
+        if event.widget is not widget:
+            return
+        for task in [t for t in self.tasks if t["widget"] is widget]:
+            self.unregister(task)
+
+    def schedule(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+        visible = [task for task in self.tasks if self.is_visible(task)]
+        if not visible:
+            # Nadie está mirando: el reloj queda detenido
+            return
+        delay = min(task["due"] for task in visible) - time.monotonic()
+        self.after_id = self.root.after(max(1, int(delay * 1000)), self.tick)
+
+    def tick(self):
+        self.after_id = None
+        now = time.monotonic()
+        for task in list(self.tasks):
+            if not self.is_visible(task) or now < task["due"]:
+                continue
+            frames = int((now - task["due"]) / task["interval"]) + 1
+            if frames > self.MAX_SKIP_FRAMES:
+                # Demasiado atraso: resincronizar en vez de ponerse al día
+                frames = self.MAX_SKIP_FRAMES
+                task["due"] = now + task["interval"]
+            else:
+                task["due"] += frames * task["interval"]
+            try:
+                task["callback"](frames)
+            except tk.TclError:
+                self.unregister(task)
+        self.schedule()
+
+@lru_cache(maxsize=None)
+def infinity_tables(center_x, center_y, radius, speed, descend_steps):
+    """Precalcula el recorrido en forma de ocho y las posiciones de la flecha.
+
+    Devuelve la trayectoria aplanada (x0, y0, x1, y1, ...) de un ciclo completo,
+    la punta de flecha para cada paso del ciclo y la de cada paso del descenso.
+    """
+    steps = math.ceil(4 * math.pi / speed)
+    path = []
+    arrows = []
+    for step in range(steps):
+        t = step * speed
+        x = center_x + radius * math.sin(t) * 1.5
+        y = center_y + radius * math.sin(t) * math.cos(t)
+        path.extend((x, y))
+
+        dx = 10 * math.cos(t)
+        dy = 10 * math.sin(t)
+        arrows.append((
+            x, y,
+            x - dy, y + dx,
+            x + dy, y - dx
+        ))
+
+    descent = []
+    for step in range(descend_steps + 1):
+        x = center_x
+        y = center_y + step / descend_steps * 130
+        descent.append((
+            x, y,
+            x - 10, y + 15,
+            x + 10, y + 15
+        ))
+    return tuple(path), tuple(arrows), tuple(descent)
+
 
 class InfinityDownloadAnimation:
     def __init__(self, root):
@@ -11,75 +166,66 @@ class InfinityDownloadAnimation:
         self.center_x = 300
         self.center_y = 200
         self.radius = 80
-        self.phase = 0
         self.speed = 0.05
         self.trail_length = 50
+        self.max_descend_steps = 60
+
+        self.path, self.arrow_frames, self.descend_frames = infinity_tables(
+            self.center_x, self.center_y, self.radius, self.speed, self.max_descend_steps
+        )
+
+        # La estela es siempre un tramo contiguo del recorrido: basta con
+        # guardar sus índices de inicio y fin (en puntos)
+        self.step_index = 0
+        self.trail_start = 0
+        self.trail_end = 0
 
-        self.trail_points = []
         self.arrow = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill="orange")
-        self.trail = self.canvas.create_line([], fill="orange", width=3, smooth=True)
+        self.trail = self.canvas.create_line(-10, -10, -10, -10, fill="orange", width=3, smooth=True)
 
         self.box = self.canvas.create_rectangle(270, 330, 330, 350, outline="white", fill="gray")
         self.descending = False
         self.descend_step = 0
-        self.max_descend_steps = 60
 
-        self.animate()
+        self.clock = AnimationClock.for_widget(self.canvas)
+        self.clock.register(self.canvas, self.animate, 30)
 
-    def infinity_path(self, t):
-        a = self.radius
-        x = a * math.sin(t)
-        y = a * math.sin(t) * math.cos(t)
-        return self.center_x + x * 1.5, self.center_y + y
+    def animate(self, frames=1):
+        # Avanzar el estado por cada cuadro transcurrido y dibujar una sola vez
+        for _ in range(frames):
+            arrow_points = self.step()
 
-    def animate(self):
+        if self.trail_end - self.trail_start >= 2:
+            self.canvas.coords(self.trail, self.path[2 * self.trail_start:2 * self.trail_end])
+        else:
+            # Una línea necesita al menos dos puntos: ocultarla fuera del lienzo
+            self.canvas.coords(self.trail, -10, -10, -10, -10)
+        if arrow_points:
+            self.canvas.coords(self.arrow, arrow_points)
+
+    def step(self):
+        arrow_points = None
         if not self.descending:
-            x, y = self.infinity_path(self.phase)
-            self.trail_points.append((x, y))
-            if len(self.trail_points) > self.trail_length:
-                self.trail_points.pop(0)
-
-            flat_points = [coord for point in self.trail_points for coord in point]
-            if len(flat_points) >= 4:
-                self.canvas.coords(self.trail, *flat_points)
-
-            angle = self.phase
-            dx = 10 * math.cos(angle)
-            dy = 10 * math.sin(angle)
-            self.canvas.coords(
-                self.arrow,
-                x, y,
-                x - dy, y + dx,
-                x + dy, y - dx
-            )
-
-            self.phase += self.speed
-            if self.phase >= 4 * math.pi:
+            arrow_points = self.arrow_frames[self.step_index]
+            self.trail_end = self.step_index + 1
+            self.trail_start = max(0, self.trail_end - self.trail_length)
+
+            self.step_index += 1
+            if self.step_index >= len(self.arrow_frames):
                 self.descending = True
                 self.descend_step = 0
         else:
-            if self.trail_points:
-                self.trail_points.pop(0)
-                flat_points = [coord for point in self.trail_points for coord in point]
-                self.canvas.coords(self.trail, *flat_points)
+            if self.trail_start < self.trail_end:
+                self.trail_start += 1
 
             if self.descend_step <= self.max_descend_steps:
-                progress = self.descend_step / self.max_descend_steps
-                x = self.center_x
-                y = self.center_y + progress * 130
-                self.canvas.coords(
-                    self.arrow,
-                    x, y,
-                    x - 10, y + 15,
-                    x + 10, y + 15
-                )
+                arrow_points = self.descend_frames[self.descend_step]
                 self.descend_step += 1
             else:
-                self.phase = 0
-                self.trail_points.clear()
+                self.step_index = 0
+                self.trail_start = self.trail_end = 0
                 self.descending = False
-
-        self.root.after(30, self.animate)
+        return arrow_points
 
 # Ejecutar solo en un entorno con interfaz gráfica (no en servidores sin display)
 if __name__ == "__main__":
@@ -1,13 +1,22 @@
 # Copyright © 2021 rdbende <rdbende@gmail.com>
 
-set dir [file dirname [info script]]
-source [file join $dir theme light.tcl]
-source [file join $dir theme dark.tcl]
+set azure_dir [file dirname [file normalize [info script]]]
+
+# Themes are sourced on first use, so only the active theme's images are created
+proc load_theme {mode} {
+	if {[lsearch -exact [ttk::style theme names] "azure-$mode"] == -1} {
+		uplevel #0 [list source [file join $::azure_dir theme $mode.tcl]]
+	}
+}
 
 
 option add *tearOff 0
 
 proc set_theme {mode} {
+	if {$mode == "dark" || $mode == "light"} {
+		load_theme $mode
+	}
+
 	if {$mode == "dark"} {
 		ttk::style theme use "azure-dark"
 
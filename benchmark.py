@@ -0,0 +1,521 @@
+"""Benchmarks de las rutas críticas de la interfaz.
+
+Uso:
+    python benchmark.py                     # compara con la referencia de este equipo
+    python benchmark.py --save-baseline     # guarda los tiempos actuales como referencia
+    python benchmark.py --backend tk        # con Tk real (por ejemplo bajo xvfb-run)
+
+Sin pantalla se usa un backend falso cuyos widgets solo registran las llamadas,
+de modo que se mide el coste de Python de cada ruta en cualquier equipo Linux.
+
+Los tiempos solo son comparables en el mismo equipo: la referencia se guarda
+por equipo junto a las métricas y se graba sola en la primera ejecución.
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import animacion
+import instalador
+import Office_Configuration as app_module
+from despacho import TkDispatcher
+from metricas import default_metrics_dir
+from registro import LogFilter, LogIndex, LogSink, LogStore, SessionLog
+
+
+# Regresión: más lento que la referencia por encima de este margen, o del ruido
+# medido en el equipo al grabar la referencia si es mayor
+DEFAULT_THRESHOLD = 0.25
+
+# Pasadas completas al grabar la referencia: se guarda la mediana y la dispersión
+BASELINE_PASSES = 3
+
+# Veces que se repite un benchmark más lento antes de darlo por regresión
+DEFAULT_RETRIES = 2
+
+
+# Valores que devuelven los métodos falsos cuando el código los usa
+RETURN_VALUES = {"index": "1.0", "after": "after#1", "bbox": (0, 0, 100, 100), "yview": (0.0, 1.0)}
+
+
+class FakeWidget:
+    """Sustituto de un widget de Tk que solo cuenta las llamadas recibidas."""
+
+    def __init__(self, root=None):
+        self.root = root or self
+        self.calls = {}
+
+    def _root(self):
+        return self.root
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return RETURN_VALUES.get(name)
+        return record
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakePhotoImage(FakeWidget):
+    def __init__(self, master=None, width=0, height=0):
+        super().__init__(master)
+        self.width = width
+        self.height = height
+
+
+def make_fake_app():
+    app = app_module.OfficeInstallerApp.__new__(app_module.OfficeInstallerApp)
+    app.root = FakeWidget()
+    app.log_text = FakeWidget(app.root)
+    app.status_label = FakeWidget(app.root)
+    app.install_button = FakeWidget(app.root)
+    app.activate_button = FakeWidget(app.root)
+    app.log_sink = LogSink()
+    app.log_store = LogStore()
+    app.session_log = None
+    app.log_view_start = app.log_view_end = 0
+    app.log_paging = False
+    app.log_store_failed = False
+    app.log_index = LogIndex()
+    app.log_filter = LogFilter()
+    app.log_filter_job = None
+    app.filter_matches = app.filter_shown = 0
+    app.errors_only_var = FakeVar(False)
+    app.stderr_only_var = FakeVar(False)
+    app.search_var = FakeVar("")
+    app.filter_status_var = FakeVar("")
+    app.pending_progress = app.shown_progress = None
+    app.run_tracer = app_module.NULL_TRACER
+    app.main_canvas = FakeWidget(app.root)
+    app.canvas_window = 1
+    app.layout_job = None
+    app.pending_canvas_width = app.applied_canvas_width = None
+    app.pending_scrollregion = False
+    app.layout_skipped = 0
+    app.jobs_changed = False
+    app.dispatcher = TkDispatcher(app.root)
+    app.version_var = FakeVar("2021")
+    app.architecture_var = FakeVar("64")
+    app.language_var = FakeVar("es-es")
+    app.visio_var = FakeVar(True)
+    app.project_var = FakeVar(True)
+    app.exclude_lync_var = FakeVar(True)
+    return app
+
+
+def make_fake_loading_window():
+    window = app_module.LoadingWindow.__new__(app_module.LoadingWindow)
+    window.canvas = FakeWidget()
+    window.wave_line = 1
+    window.wave_frames = app_module.wave_frames()
+    window.frame = 0
+    window.running = True
+    return window
+
+
+def make_fake_infinity():
+    anim = animacion.InfinityDownloadAnimation.__new__(animacion.InfinityDownloadAnimation)
+    anim.canvas = FakeWidget()
+    anim.center_x, anim.center_y, anim.radius = 300, 200, 80
+    anim.speed, anim.trail_length, anim.max_descend_steps = 0.05, 50, 60
+    anim.path, anim.arrow_frames, anim.descend_frames = animacion.infinity_tables(300, 200, 80, 0.05, 60)
+    anim.step_index = anim.trail_start = anim.trail_end = 0
+    anim.descending = False
+    anim.descend_step = 0
+    anim.trail, anim.arrow = 1, 2
+    return anim
+
+
+class Backend:
+    """Crea los objetos a medir con widgets falsos o con Tk real."""
+
+    def __init__(self, name):
+        self.name = name
+        self.root = None
+        if name == "tk":
+            import tkinter as tk
+            self.root = tk.Tk()
+            self.root.withdraw()
+
+    def app(self):
+        if self.root is None:
+            return make_fake_app()
+        return app_module.OfficeInstallerApp(self.root)
+
+    def loading_window(self):
+        if self.root is None:
+            return make_fake_loading_window()
+        return app_module.LoadingWindow(self.root)
+
+    def infinity(self):
+        if self.root is None:
+            return make_fake_infinity()
+        import tkinter as tk
+        return animacion.InfinityDownloadAnimation(tk.Toplevel(self.root))
+
+    def close(self):
+        if self.root is not None:
+            self.root.destroy()
+
+
+def measure(func, ops, rounds, setup=None):
+    """Devuelve el mejor tiempo en segundos por operación de ``func``.
+
+    Se toma el mínimo de varias rondas, tras una de calentamiento, porque es
+    la medida menos sensible al ruido de otros procesos del equipo. ``setup``
+    se llama antes de cada ronda, fuera de la medición, para que todas partan
+    del mismo estado.
+    """
+    if setup:
+        setup()
+    func()
+    samples = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) / ops)
+    return min(samples)
+
+
+def bench_log_message(backend, rounds):
+    app = backend.app()
+    lines = 1000
+
+    def run():
+        for i in range(lines):
+            app.log_message(f"📄 Línea de prueba número {i} del instalador")
+        app.flush_log()
+    # Cada ronda empieza con el almacén y el índice del log vacíos
+    result = measure(run, lines, rounds, setup=app.clear_log)
+    app.log_store.close()
+    return result
+
+
+def bench_log_message_session(backend, rounds):
+    # Igual que log_message, con el registro persistente de la sesión activo
+    app = backend.app()
+    directory = tempfile.mkdtemp(prefix="office_bench_")
+    previous = app.session_log
+    app.session_log = SessionLog(directory).start()
+    lines = 1000
+
+    def run():
+        for i in range(lines):
+            app.log_message(f"📄 Línea de prueba número {i} del instalador")
+        app.flush_log()
+    try:
+        return measure(run, lines, rounds, setup=app.clear_log)
+    finally:
+        app.session_log.close()
+        app.session_log = previous
+        app.log_store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_log_search(backend, rounds):
+    # Filtros y búsquedas sobre un historial de 100000 líneas ya indexado
+    app = backend.app()
+    for i in range(100000):
+        if i % 500 == 0:
+            app.log_message(f"❌ Error 0x8007{i:04x} durante la instalación")
+        else:
+            app.log_message(f"📄 Download {i:08d} " + "x" * 60, "stdout")
+    while app.log_sink._queue.qsize():
+        app.flush_log()
+    queries = [(True, False, ""), (False, False, "download 0009"), (True, False, r"0x8007\w+"), (False, False, "")]
+
+    def run():
+        for errors_only, stderr_only, query in queries:
+            app.errors_only_var.set(errors_only)
+            app.stderr_only_var.set(stderr_only)
+            app.search_var.set(query)
+            app.apply_log_filter()
+    try:
+        return measure(run, len(queries), rounds)
+    finally:
+        app.log_store.close()
+
+
+def bench_update_status(backend, rounds):
+    app = backend.app()
+
+    def run():
+        for i in range(1000):
+            app.update_status(f"✓ Mensaje de estado bastante largo para recortar número {i} ▶")
+    result = measure(run, 1000, rounds)
+    app.log_store.close()
+    return result
+
+
+def bench_dispatch(backend, rounds):
+    # Llamadas enviadas desde un hilo de trabajo y ejecutadas por lotes en el de Tk
+    app = backend.app()
+    calls = 1000
+
+    def run():
+        for i in range(calls):
+            app.dispatcher.post(app.toggle_buttons, i % 2 == 0)
+        for _ in range(calls // app.dispatcher.batch_max + 1):
+            app.dispatcher.pump()
+    result = measure(run, calls, rounds)
+    app.log_store.close()
+    return result
+
+
+def bench_configure_burst(backend, rounds):
+    # Ráfaga de <Configure> como al arrastrar el borde: 100 eventos por cuadro
+    app = backend.app()
+    events = [SimpleNamespace(width=600 + i, height=500) for i in range(100)]
+
+    def run():
+        for _ in range(100):
+            for event in events:
+                app.on_canvas_configure(event)
+                app.on_frame_configure(event)
+            if app.layout_job is not None:
+                app.root.after_cancel(app.layout_job)
+            app.apply_layout()
+    result = measure(run, 100 * len(events), rounds)
+    app.log_store.close()
+    return result
+
+
+def bench_animate_wave(backend, rounds):
+    window = backend.loading_window()
+
+    def run():
+        for _ in range(1000):
+            window.animate_wave(1)
+    result = measure(run, 1000, rounds)
+    if backend.root is not None:
+        window.close()
+    return result
+
+
+def bench_create_gradient(backend, rounds, cached=False):
+    window = backend.loading_window()
+    original = app_module.tk.PhotoImage
+    if backend.root is None:
+        app_module.tk.PhotoImage = FakePhotoImage
+
+    def run():
+        # Sin caché se mide la generación completa del gradiente
+        if not cached:
+            app_module._gradient_cache.clear()
+        window.create_gradient_bg()
+    try:
+        return measure(run, 1, rounds)
+    finally:
+        app_module.tk.PhotoImage = original
+        app_module._gradient_cache.clear()
+        if backend.root is not None:
+            window.close()
+
+
+def bench_create_gradient_cached(backend, rounds):
+    return bench_create_gradient(backend, rounds, cached=True)
+
+
+def bench_infinity_animate(backend, rounds):
+    anim = backend.infinity()
+
+    def run():
+        for _ in range(1000):
+            anim.animate(1)
+    return measure(run, 1000, rounds)
+
+
+def bench_generate_config_xml(backend, rounds):
+    app = backend.app()
+
+    def run():
+        for _ in range(1000):
+            app.generate_config_xml()
+    result = measure(run, 1000, rounds)
+    app.log_store.close()
+    return result
+
+
+def bench_child_pipeline(backend, rounds):
+    # Lector de tuberías + registro, con el simulador de setup.exe a máxima velocidad
+    app = backend.app()
+    lines = 20000
+    simulator = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulador_setup.py")
+    log_dir = tempfile.mkdtemp(prefix="office_bench_")
+    command = [sys.executable, simulator, "--duration", "60", "--stdout-rate", "0",
+               "--max-lines", str(lines), "--log-dir", log_dir]
+
+    def run():
+        instalador.run_logged(command, app.log_message)
+        for _ in range(lines // app_module.LOG_BATCH_MAX + 1):
+            app.flush_log()
+    try:
+        return measure(run, lines, max(3, rounds // 2), setup=app.clear_log)
+    finally:
+        app.log_store.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def bench_cold_start(backend, rounds):
+    # Sin pantalla: solo importaciones; con Tk: hasta la primera vuelta del mainloop
+    if backend.root is None:
+        code = "import Office_Configuration"
+    else:
+        code = (
+            "import tkinter as tk, Office_Configuration as o; root = tk.Tk(); "
+            "o.OfficeInstallerApp(root); root.after(0, root.destroy); root.mainloop()"
+        )
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def run():
+        subprocess.run([sys.executable, "-c", code], cwd=directory, check=True)
+    return measure(run, 1, max(3, rounds // 2))
+
+
+BENCHMARKS = [
+    ("log_message", bench_log_message),
+    ("log_message_session", bench_log_message_session),
+    ("log_search", bench_log_search),
+    ("update_status", bench_update_status),
+    ("dispatch", bench_dispatch),
+    ("configure_burst", bench_configure_burst),
+    ("animate_wave", bench_animate_wave),
+    ("create_gradient_bg", bench_create_gradient),
+    ("create_gradient_bg_cached", bench_create_gradient_cached),
+    ("infinity_animate", bench_infinity_animate),
+    ("generate_config_xml", bench_generate_config_xml),
+    ("child_pipeline", bench_child_pipeline),
+    ("cold_start", bench_cold_start),
+]
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def default_baseline_file():
+    return os.path.join(default_metrics_dir(), f"benchmark-{socket.gethostname()}.json")
+
+
+def run_benchmarks(backend, names, rounds):
+    results = {}
+    for name, bench in BENCHMARKS:
+        if name in names:
+            results[name] = bench(backend, rounds)
+            # La basura de un benchmark (índices del log, widgets) no se cobra en el siguiente
+            gc.collect()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la interfaz del instalador.")
+    parser.add_argument("--backend", choices=["auto", "fake", "tk"], default="auto")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--baseline", default=None,
+                        help="archivo de referencia (por defecto, el de este equipo en las métricas)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="margen de regresión permitido (0.25 = 25%% más lento)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="veces que se repite un benchmark más lento antes de darlo por regresión")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--only", nargs="*", help="ejecutar solo estos benchmarks")
+    args = parser.parse_args(argv)
+    baseline_file = args.baseline or default_baseline_file()
+
+    backend_name = args.backend
+    if backend_name == "auto":
+        has_display = os.name == "nt" or os.environ.get("DISPLAY")
+        backend_name = "tk" if has_display else "fake"
+    backend = Backend(backend_name)
+
+    baselines = load_baseline(baseline_file)
+    reference = baselines.get(backend_name, {})
+    names = [name for name, _ in BENCHMARKS if not args.only or name in args.only]
+    # Sin referencia en este equipo, la primera ejecución la graba
+    record = names if args.save_baseline else [name for name in names if name not in reference]
+
+    def limit(name):
+        base = reference[name]
+        return base["seconds"] * (1 + max(args.threshold, base["noise"]))
+
+    results = {}
+    try:
+        if record:
+            passes = [run_benchmarks(backend, record, args.rounds) for _ in range(BASELINE_PASSES)]
+            for name in record:
+                samples = [times[name] for times in passes]
+                results[name] = min(samples)
+                reference[name] = {
+                    "seconds": round(statistics.median(samples), 9),
+                    "noise": round(max(samples) / min(samples) - 1, 3),
+                }
+        results.update(run_benchmarks(backend, [name for name in names if name not in results], args.rounds))
+        # Una regresión tiene que repetirse: el ruido del equipo rara vez dura varias pasadas
+        for _ in range(args.retries):
+            slower = [name for name, seconds in results.items() if seconds > limit(name)]
+            if not slower:
+                break
+            for name, seconds in run_benchmarks(backend, slower, args.rounds).items():
+                results[name] = min(results[name], seconds)
+    finally:
+        backend.close()
+
+    regressions = []
+    print(f"Backend: {backend_name}")
+    print(f"{'benchmark':<28}{'actual':>14}{'referencia':>14}{'cambio':>10}{'margen':>9}")
+    for name in names:
+        seconds, base = results[name], reference[name]["seconds"]
+        margin = limit(name) / base - 1
+        print(
+            f"{name:<28}{seconds * 1e6:>11.2f} µs{base * 1e6:>11.2f} µs"
+            f"{(seconds / base - 1) * 100:>+9.1f}%{margin * 100:>8.0f}%"
+        )
+        if seconds > limit(name):
+            regressions.append(name)
+
+    if record:
+        baselines[backend_name] = reference
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_file)), exist_ok=True)
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"Referencia guardada en {baseline_file}: {', '.join(record)}")
+        if args.save_baseline:
+            return 0
+
+    if regressions:
+        print(f"Regresiones por encima del margen: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
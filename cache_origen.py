@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+
+# Tamaño máximo por defecto de la caché de orígenes (bytes)
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+INDEX_FILE = "index.json"
+
+# Puerto por defecto del espejo HTTP de la caché (ver espejo.py)
+MIRROR_PORT = 8765
+
+
+def default_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "OfficeInstaller", "cache")
+
+
+def directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def is_mirror_url(url):
+    """True si ``url`` tiene la forma ``http(s)://equipo[:puerto]`` de un espejo."""
+    from urllib.parse import urlsplit
+
+    try:
+        parts = urlsplit(url)
+        parts.port
+    except ValueError:
+        return False
+    return (
+        parts.scheme in ("http", "https") and bool(parts.hostname)
+        and parts.path in ("", "/") and not (parts.query or parts.fragment or parts.username)
+    )
+
+
+def mirror_url(base_url, key):
+    """URL del origen ``key`` en el espejo de otro equipo."""
+    return f"{base_url.rstrip('/')}/{key}"
+
+
+class SourceCache:
+    """Caché local de orígenes de Office descargados con ``setup.exe /download``.
+
+    Cada origen se guarda en un directorio cuyo nombre es el hash del XML de
+    descarga, así que la misma selección siempre apunta al mismo contenido.
+    ``index.json`` guarda el tamaño y el último uso de cada entrada; al superar
+    ``max_bytes`` se eliminan primero las menos usadas recientemente.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.root, INDEX_FILE)
+
+    @staticmethod
+    def key(download_xml):
+        return hashlib.sha256(download_xml.encode("utf-8")).hexdigest()[:16]
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, key):
+        """Devuelve la ruta del origen si está completo y marca su uso."""
+        index = self.load_index()
+        entry = index.get(key)
+        if entry is None or not os.path.isdir(self.path(key)):
+            return None
+        entry["last_used"] = time.time()
+        self.save_index(index)
+        return self.path(key)
+
+    def stage(self, key, download, label=""):
+        """Descarga un origen en la caché si falta y devuelve su ruta.
+
+        ``download`` recibe el directorio de destino y devuelve True si la
+        descarga terminó bien. Se descarga en un directorio temporal que solo
+        se renombra a su ruta final al completarse.
+        """
+        path = self.lookup(key)
+        if path:
+            return path
+
+        staging = self.path(key) + ".partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        try:
+            completed = download(staging)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if not completed:
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+
+        shutil.rmtree(self.path(key), ignore_errors=True)
+        os.replace(staging, self.path(key))
+
+        index = self.load_index()
+        index[key] = {
+            "label": label,
+            "size": directory_size(self.path(key)),
+            "last_used": time.time(),
+        }
+        self.evict(index, keep=key)
+        self.save_index(index)
+        return self.path(key)
+
+    def evict(self, index, keep=None):
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= index.pop(key)["size"]
@@ -0,0 +1,191 @@
+"""Generación de los XML del Office Deployment Tool a partir de un catálogo.
+
+Los canales y productos de cada versión están en ``CHANNELS`` y ``PRODUCTS``;
+el XML se arma como árbol de elementos y se guarda en memoria por selección,
+de modo que los clics repetidos no vuelven a generarlo.
+"""
+import hashlib
+import itertools
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from functools import lru_cache
+
+
+VERSIONS = ["2019", "2021", "365"]
+ARCHITECTURES = ["64", "32"]
+LANGUAGES = ["en-us", "es-es", "fr-fr", "de-de", "pt-br"]
+
+# Canal de cada versión y sufijo de sus IDs de producto ("ProPlus2021Volume")
+Channel = namedtuple("Channel", ["name", "suffix"])
+
+CHANNELS = {
+    "2019": Channel("PerpetualVL2019", "2019"),
+    "2021": Channel("PerpetualVL2021", "2021"),
+    "365": Channel("PerpetualVL", ""),
+}
+
+# Prefijo de ID de cada producto y opción de la selección que lo activa
+PRODUCTS = [
+    ("ProPlus", None),
+    ("VisioPro", "visio"),
+    ("ProjectPro", "project"),
+]
+
+# Combinaciones de complementos (visio, project) para la matriz completa
+ADDON_COMBINATIONS = [(False, False), (True, False), (False, True), (True, True)]
+
+# Selección completa de una instalación: clave de la memoria de XML generados
+Selection = namedtuple(
+    "Selection",
+    ["version", "architecture", "language", "visio", "project", "exclude_lync", "source_path"],
+    defaults=(False, False, True, None)
+)
+
+
+def channel_for(version):
+    # Cualquier versión sin canal propio usa el de Microsoft 365
+    return CHANNELS.get(version, CHANNELS["365"])
+
+
+def requested_products(version, visio=False, project=False):
+    """IDs de producto de la selección, en el orden en que se instalan."""
+    options = {None: True, "visio": visio, "project": project}
+    suffix = channel_for(version).suffix
+    return [f"{prefix}{suffix}Volume" for prefix, option in PRODUCTS if options[option]]
+
+
+def add_element(version, architecture, source_path):
+    attributes = {}
+    if source_path:
+        attributes["SourcePath"] = source_path
+    attributes["OfficeClientEdition"] = architecture
+    attributes["Channel"] = channel_for(version).name
+    return ET.Element("Add", attributes)
+
+
+def add_product(add, product_id, language, exclude_lync):
+    product = ET.SubElement(add, "Product", ID=product_id)
+    ET.SubElement(product, "Language", ID=language)
+    if exclude_lync and product_id.startswith("ProPlus"):
+        ET.SubElement(product, "ExcludeApp", ID="Lync")
+
+
+def render(add, remove_all):
+    """Envuelve ``<Add>`` en la configuración completa y la serializa."""
+    root = ET.Element("Configuration")
+    root.append(add)
+    if remove_all:
+        ET.SubElement(root, "Remove", All="True")
+    ET.SubElement(root, "Display", Level="None", AcceptEULA="TRUE")
+    ET.SubElement(root, "Property", Name="AUTOACTIVATE", Value="1")
+    ET.indent(root, space="    ")
+    return ET.tostring(root, encoding="unicode")
+
+
+@lru_cache(maxsize=256)
+def render_selection(selection):
+    add = add_element(selection.version, selection.architecture, selection.source_path)
+    for product_id in requested_products(selection.version, selection.visio, selection.project):
+        add_product(add, product_id, selection.language, selection.exclude_lync)
+    return render(add, remove_all=True)
+
+
+@lru_cache(maxsize=256)
+def render_delta(version, architecture, additions, exclude_lync, source_path):
+    add = add_element(version, architecture, source_path)
+    for product_id, language in additions:
+        add_product(add, product_id, language, exclude_lync)
+    return render(add, remove_all=False)
+
+
+def build_config_xml(version, architecture, language, visio=False, project=False, exclude_lync=True,
+                     source_path=None):
+    """Genera el contenido de configuration.xml para la selección dada.
+
+    Con ``source_path`` la instalación usa ese origen (por ejemplo, la caché
+    local) en lugar de descargar de Internet.
+    """
+    return render_selection(
+        Selection(version, architecture, language, bool(visio), bool(project), bool(exclude_lync), source_path)
+    )
+
+
+def build_delta_xml(version, architecture, additions, exclude_lync=True, source_path=None):
+    """Configuración que solo agrega los (producto, idioma) indicados, sin <Remove>."""
+    additions = tuple((product_id, language) for product_id, language in additions)
+    return render_delta(version, architecture, additions, bool(exclude_lync), source_path)
+
+
+def build_download_xml(version, architecture, languages, source_path=None):
+    """Genera la configuración de ``setup.exe /download`` para una selección.
+
+    El origen descargado es el mismo para todos los productos de un canal, por
+    lo que basta con ProPlus para luego instalar también Visio o Project. El
+    texto es la clave de la caché de orígenes, así que su formato no cambia.
+    """
+    channel = channel_for(version)
+    source = f' SourcePath="{source_path}"' if source_path else ''
+    language_lines = "".join(
+        f'\n            <Language ID="{language}"/>' for language in sorted(set(languages))
+    )
+    return f"""<Configuration>
+    <Add{source} OfficeClientEdition="{architecture}" Channel="{channel.name}">
+        <Product ID="ProPlus{channel.suffix}Volume">{language_lines}
+        </Product>
+    </Add>
+</Configuration>"""
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def write_config(path, content):
+    """Escribe ``content`` en ``path`` solo si cambió; devuelve True si escribió.
+
+    La escritura es atómica: un archivo temporal reemplaza al anterior, así
+    setup.exe nunca lee una configuración a medio escribir.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if content_hash(f.read()) == content_hash(content):
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+    return True
+
+
+def build_matrix(versions=VERSIONS, architectures=ARCHITECTURES, languages=LANGUAGES,
+                 addons=ADDON_COMBINATIONS, exclude_lync=True, source_path=None):
+    """Genera todas las combinaciones de versión, arquitectura, idioma y complementos.
+
+    Devuelve una lista de ``(Selection, xml)``, una por cada archivo de la matriz.
+    """
+    matrix = []
+    for version, architecture, language, (visio, project) in itertools.product(
+            versions, architectures, languages, addons):
+        selection = Selection(version, architecture, language, visio, project, exclude_lync, source_path)
+        matrix.append((selection, render_selection(selection)))
+    return matrix
+
+
+def config_name(selection):
+    addons = "".join(f"+{name}" for name in ("visio", "project") if getattr(selection, name))
+    return f"{selection.version}-x{selection.architecture}-{selection.language}{addons}.xml"
+
+
+def write_matrix(directory, matrix):
+    """Escribe cada XML de la matriz en ``directory``; devuelve las rutas escritas."""
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for selection, content in matrix:
+        path = os.path.join(directory, config_name(selection))
+        if write_config(path, content):
+            written.append(path)
+    return written
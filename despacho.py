@@ -0,0 +1,60 @@
+import queue
+import sys
+import time
+
+from metricas import NULL_TRACER
+
+
+class TkDispatcher:
+    """Ejecuta en el hilo de Tk las llamadas a widgets enviadas por otros hilos.
+
+    Los hilos de trabajo usan ``post``, que solo encola y nunca espera a la
+    interfaz. El hilo de Tk vacía la cola por lotes con ``after`` y mide el
+    retraso entre el envío y la ejecución de cada llamada.
+    """
+
+    def __init__(self, root, interval_ms=16, batch_max=200):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.batch_max = batch_max
+        self.tracer = NULL_TRACER
+        self.count = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+        self._queue = queue.SimpleQueue()
+        self._job = None
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self.pump)
+        return self
+
+    def post(self, func, *args, **kwargs):
+        """Encola ``func(*args, **kwargs)`` para el hilo de Tk; seguro desde cualquier hilo."""
+        self._queue.put((time.perf_counter(), func, args, kwargs))
+
+    def pump(self):
+        self._job = None
+        for _ in range(self.batch_max):
+            try:
+                posted, func, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            delay = time.perf_counter() - posted
+            self.count += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+            self.tracer.observe("ui_dispatch_s", delay)
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                # Un widget ya destruido no debe detener el resto del lote; el
+                # error va al mismo manejador que los de los callbacks de Tk
+                self.root.report_callback_exception(*sys.exc_info())
+        # Si el lote quedó lleno se vuelve enseguida; si no, al siguiente cuadro
+        delay = 1 if not self._queue.empty() else self.interval_ms
+        self._job = self.root.after(delay, self.pump)
+
+    def stats(self):
+        mean = self.total_delay / self.count if self.count else 0.0
+        return {"count": self.count, "mean_s": round(mean, 6), "max_s": round(self.max_delay, 6)}
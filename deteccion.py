@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+
+# Configuración de Click-to-Run en el registro (HKLM)
+C2R_CONFIGURATION_KEY = r"SOFTWARE\Microsoft\Office\ClickToRun\Configuration"
+
+PLATFORM_ARCHITECTURES = {"x64": "64", "x86": "32"}
+
+# Office instalado: IDs de producto, idiomas, arquitectura ("64"/"32") y
+# aplicaciones excluidas de cada producto ({id: frozenset(["lync", ...])})
+InstalledOffice = namedtuple("InstalledOffice", ["products", "languages", "architecture", "excluded_apps"])
+
+# Plan de instalación: "full" (quitar todo y reinstalar), "delta" (solo <Add>)
+# o "none"; ``add`` lista los (producto, idioma) que faltan
+InstallPlan = namedtuple("InstallPlan", ["mode", "add", "reason"])
+
+
+class WindowsRegistry:
+    """Lee los valores de la configuración Click-to-Run del registro de Windows.
+
+    Cualquier objeto con un método ``get(nombre)`` (por ejemplo, un ``dict``)
+    puede sustituirlo como registro falso en pruebas o fuera de Windows.
+    """
+
+    def get(self, name, default=None):
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, C2R_CONFIGURATION_KEY) as key:
+                return winreg.QueryValueEx(key, name)[0]
+        except (ImportError, OSError):
+            return default
+
+
+def detect_installed(registry=None):
+    """Detecta el Office Click-to-Run instalado; ``None`` si no hay ninguno."""
+    registry = WindowsRegistry() if registry is None else registry
+    release_ids = registry.get("ProductReleaseIds")
+    if not release_ids:
+        return None
+
+    products = frozenset(pid.strip() for pid in release_ids.split(",") if pid.strip())
+    culture = registry.get("ClientCulture")
+    languages = frozenset([culture.lower()]) if culture else frozenset()
+    architecture = PLATFORM_ARCHITECTURES.get(registry.get("Platform"))
+    excluded_apps = {}
+    for pid in products:
+        # Click-to-Run guarda el ExcludeApp de cada producto como "groove,lync"
+        excluded = registry.get(f"{pid}.ExcludedApps") or ""
+        excluded_apps[pid] = frozenset(app.strip().lower() for app in excluded.split(",") if app.strip())
+    return InstalledOffice(products, languages, architecture, excluded_apps)
+
+
+def plan_install(requested_products, language, architecture, installed, exclude_lync=True):
+    """Calcula el cambio mínimo para pasar de ``installed`` a la selección.
+
+    Solo se evita la reinstalación completa si la arquitectura coincide y todos
+    los productos instalados pertenecen a la misma versión solicitada. Un
+    ProPlus instalado con otra exclusión de Skype for Business se vuelve a
+    agregar para aplicar el ``ExcludeApp`` pedido.
+    """
+    if installed is None:
+        return InstallPlan("full", [(pid, language) for pid in requested_products], "Office no está instalado")
+    if installed.architecture and installed.architecture != architecture:
+        return InstallPlan(
+            "full",
+            [(pid, language) for pid in requested_products],
+            f"Office instalado es de {installed.architecture} bits"
+        )
+
+    requested_suffixes = {product_suffix(pid) for pid in requested_products}
+    other_versions = [pid for pid in installed.products if product_suffix(pid) not in requested_suffixes]
+    if other_versions:
+        return InstallPlan(
+            "full",
+            [(pid, language) for pid in requested_products],
+            f"Hay otra versión instalada: {', '.join(sorted(other_versions))}"
+        )
+
+    add = []
+    for pid in requested_products:
+        if pid not in installed.products or language not in installed.languages:
+            add.append((pid, language))
+        elif pid.startswith("ProPlus") and ("lync" in installed.excluded_apps.get(pid, ())) != exclude_lync:
+            add.append((pid, language))
+    if not add:
+        return InstallPlan("none", [], "Todo lo seleccionado ya está instalado")
+    return InstallPlan("delta", add, "Se agregará solo lo que falta, sin desinstalar nada")
+
+
+def product_suffix(product_id):
+    # "VisioPro2021Volume" -> "2021Volume": identifica la versión y el canal
+    for prefix in ("ProPlus", "VisioPro", "ProjectPro"):
+        if product_id.startswith(prefix):
+            return product_id[len(prefix):]
+    return product_id
+
+
+def describe_plan(plan):
+    """Texto legible del plan para mostrarlo antes de instalar."""
+    if plan.mode == "none":
+        return f"✅ {plan.reason}."
+    lines = [f"{'➕' if plan.mode == 'delta' else '♻️'} {plan.reason}."]
+    if plan.mode == "full":
+        lines.append("Se quitará cualquier instalación previa de Office y se instalará:")
+    else:
+        lines.append("Se agregará:")
+    lines.extend(f"   • {pid} ({language})" for pid, language in plan.add)
+    return "\n".join(lines)
@@ -0,0 +1,111 @@
+import os
+import re
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cache_origen import MIRROR_PORT
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class MirrorRequestHandler(BaseHTTPRequestHandler):
+    """Sirve archivos de la caché de orígenes con rangos HTTP y sendfile."""
+
+    # HTTP/1.1 mantiene la conexión abierta entre peticiones (keep-alive)
+    protocol_version = "HTTP/1.1"
+    server_version = "OfficeMirror/1.0"
+
+    def translate_path(self):
+        relative = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip("/")
+        root = os.path.realpath(self.server.root)
+        path = os.path.realpath(os.path.join(root, relative))
+        # Rechazar rutas fuera de la caché y descargas a medio terminar
+        if os.path.commonpath([root, path]) != root or ".partial" in path:
+            return None
+        return path if os.path.isfile(path) else None
+
+    def parse_range(self, size):
+        header = self.headers.get("Range")
+        if not header:
+            return None
+        match = RANGE_RE.match(header.strip())
+        if not match or match.groups() == ("", ""):
+            # Rangos múltiples o desconocidos: se sirve el archivo completo
+            return None
+        start, end = match.groups()
+        if start == "":
+            length = min(int(end), size)
+            return size - length, size - 1
+        start = int(start)
+        if end and int(end) < start:
+            # Último byte antes del primero: sintácticamente inválido, se ignora (RFC 7233)
+            return None
+        end = min(int(end), size - 1) if end else size - 1
+        return start, end
+
+    def send_body(self, head_only):
+        path = self.translate_path()
+        if path is None:
+            self.send_error(404, "No encontrado")
+            return
+
+        size = os.path.getsize(path)
+        byte_range = self.parse_range(size)
+        if byte_range and (byte_range[0] >= size or byte_range[0] > byte_range[1]):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        count = end - start + 1 if size else 0
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(count))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if head_only or not count:
+            return
+        with open(path, "rb") as f:
+            # socket.sendfile usa os.sendfile (sin copias) donde está disponible
+            self.connection.sendfile(f, start, count)
+
+    def do_GET(self):
+        self.send_body(head_only=False)
+
+    def do_HEAD(self):
+        self.send_body(head_only=True)
+
+    def log_message(self, format, *args):
+        if self.server.log:
+            self.server.log(f"🌐 {self.address_string()} {format % args}")
+
+
+class MirrorServer(ThreadingHTTPServer):
+    """Servidor HTTP opcional que comparte la caché de orígenes en la red local."""
+
+    daemon_threads = True
+
+    def __init__(self, root, host="0.0.0.0", port=MIRROR_PORT, log=None):
+        super().__init__((host, port), MirrorRequestHandler)
+        self.root = root
+        self.log = log
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,418 @@
+"""Lógica de instalación de Office sin interfaz gráfica.
+
+Este módulo no importa tkinter ni carga recursos del tema, de modo que puede
+usarse tanto desde la aplicación gráfica como en modo desatendido:
+
+    python instalador.py --version 2021 --arch 64 --language es-es --visio
+"""
+import ctypes
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+from cache_origen import DEFAULT_MAX_BYTES, MIRROR_PORT, SourceCache, is_mirror_url, mirror_url
+from configuracion import (
+    ARCHITECTURES, VERSIONS, build_config_xml, build_delta_xml, build_download_xml,
+    build_matrix, requested_products, write_config, write_matrix
+)
+from deteccion import describe_plan, detect_installed, plan_install
+from metricas import NULL_TRACER, Tracer
+from progreso import ProgressMonitor, format_eta
+from registro import LogRecord, format_record
+from verificaciones import CHECKS, STAGE_CHECKS, has_errors, preflight_context, run_checks, summarize
+
+
+CONFIG_FILE = "configuration.xml"
+
+# Sustituye a setup.exe (por ejemplo, por simulador_setup.py en pruebas de carga)
+SETUP_COMMAND_ENV = "OFFICE_SETUP_COMMAND"
+
+
+def is_admin():
+    try:
+        return ctypes.windll.shell32.IsUserAnAdmin()
+    except:
+        return False
+
+
+def plan_selection(version, architecture, language, visio=False, project=False, exclude_lync=True,
+                   registry=None):
+    """Compara la selección con el Office instalado y devuelve el ``InstallPlan``."""
+    products = requested_products(version, visio, project)
+    return plan_install(products, language, architecture, detect_installed(registry), exclude_lync)
+
+
+def find_setup():
+    """Busca setup.exe junto al programa o en el directorio actual."""
+    setup_path = os.path.join(os.path.dirname(sys.argv[0]), "setup.exe")
+    if os.path.exists(setup_path):
+        return setup_path
+    if os.path.exists("setup.exe"):
+        return os.path.abspath("setup.exe")
+    return None
+
+
+def setup_command():
+    """Argumentos para ejecutar el Office Deployment Tool.
+
+    Si la variable OFFICE_SETUP_COMMAND está definida, su comando reemplaza a
+    setup.exe. Devuelve ``None`` si no hay ninguno disponible.
+    """
+    override = os.environ.get(SETUP_COMMAND_ENV)
+    if override:
+        import shlex
+        if os.name == "nt":
+            return [part.strip('"') for part in shlex.split(override, posix=False)]
+        return shlex.split(override)
+    setup_path = find_setup()
+    return [setup_path] if setup_path else None
+
+
+def install_office(config_file, xml_content, log, on_progress=None, tracer=NULL_TRACER, job=None):
+    """Escribe la configuración y ejecuta setup.exe /configure.
+
+    ``log`` recibe cada mensaje de progreso y ``on_progress``, si se indica,
+    los ``Progress`` obtenidos de los logs del Office Deployment Tool en %temp%.
+    Cada fase se mide con ``tracer``. Con ``job`` (un ``trabajos.Job``), al
+    cancelarlo se termina setup.exe. Devuelve el código de salida y la salida
+    de error del proceso; ``None`` como código si no se encontró setup.exe.
+    """
+    with tracer.span("config_write"):
+        changed = write_config(config_file, xml_content)
+
+    if changed:
+        log(f"✅ Archivo de configuración generado: {config_file}")
+    else:
+        log(f"✅ Archivo de configuración sin cambios: {config_file}")
+
+    with tracer.span("setup_discovery"):
+        command = setup_command()
+    if command is None:
+        log("❌ Error: No se encontró setup.exe")
+        return None, ""
+
+    log("🚀 Iniciando instalación de Office LTSC...")
+
+    monitor = None
+    if on_progress:
+        import tempfile
+        # El Office Deployment Tool nombra sus logs con el nombre del equipo
+        prefix = os.environ.get("COMPUTERNAME", "")
+        monitor = ProgressMonitor(tempfile.gettempdir(), on_progress, prefix=prefix)
+        monitor.start()
+    try:
+        with tracer.span("child_process"):
+            return run_logged(command + ["/configure", config_file], log, tracer=tracer, job=job)
+    finally:
+        if monitor:
+            monitor.stop()
+
+
+def stage_source(cache, version, architecture, languages, log, tracer=NULL_TRACER, job=None):
+    """Asegura que el origen de la selección esté en la caché local.
+
+    Descarga con ``setup.exe /download`` solo si falta. Devuelve la ruta del
+    origen en caché o ``None`` si no se pudo preparar.
+    """
+    key = cache.key(build_download_xml(version, architecture, languages))
+    label = f"{version} x{architecture} {','.join(sorted(set(languages)))}"
+
+    def download(target):
+        command = setup_command()
+        if command is None:
+            log("❌ Error: No se encontró setup.exe")
+            return False
+        download_config = os.path.join(target, "download.xml")
+        with open(download_config, "w", encoding="utf-8") as f:
+            f.write(build_download_xml(version, architecture, languages, source_path=target))
+        log(f"⬇️ Descargando origen de Office {label} a la caché local...")
+        return_code, error_msg = run_logged(command + ["/download", download_config], log, job=job)
+        if return_code != 0:
+            log(f"❌ Error al descargar el origen (Código {return_code}): {error_msg}")
+        return return_code == 0
+
+    with tracer.span("stage_source"):
+        cached = cache.lookup(key)
+        if cached:
+            log(f"💾 Usando origen en caché: {cached}")
+            return cached
+        return cache.stage(key, download, label)
+
+
+def preflight(version, architecture, language, log, plan=None, cache=None, tracer=NULL_TRACER, checks=CHECKS):
+    """Ejecuta las verificaciones previas y envía el resumen a ``log``.
+
+    Con ``cache`` (un ``PreflightCache``) los clics repetidos reutilizan los
+    resultados recientes. Devuelve True si no hubo errores y los resultados.
+    """
+    command = setup_command()
+    setup_path = " ".join(command) if command else None
+    context = preflight_context(version, architecture, language, setup_path, plan)
+    key = (version, architecture, language, plan.mode if plan else None, tuple(name for name, _ in checks))
+    with tracer.span("preflight"):
+        results = cache.run(key, context, checks=checks) if cache else run_checks(context, checks)
+
+    log("🩺 Verificaciones previas:")
+    for line in summarize(results).splitlines():
+        log(f"   {line}")
+    return not has_errors(results), results
+
+
+def mirror_source(base_url, version, architecture, languages):
+    """SourcePath del origen de una selección en el espejo HTTP de otro equipo."""
+    key = SourceCache.key(build_download_xml(version, architecture, languages))
+    return mirror_url(base_url, key)
+
+
+def run_process(args, on_record, job=None):
+    """Ejecuta un proceso leyendo stdout y stderr a la vez.
+
+    Cada flujo tiene su propio hilo lector, así que el proceso hijo nunca se
+    bloquea con una tubería llena. ``on_record`` recibe los ``LogRecord`` de
+    ambos flujos en orden de llegada, siempre desde el hilo que llama. Con
+    ``job`` el proceso queda asociado al trabajo para poder cancelarlo.
+    Devuelve el código de salida.
+    """
+    # Se importa al usarse para no cargarlo durante el arranque de la interfaz
+    import subprocess
+
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        errors="replace",
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        # Sesión propia fuera de Windows para poder terminar todo su árbol
+        start_new_session=job is not None and os.name != "nt"
+    )
+    if job is not None:
+        job.attach(process)
+
+    records = queue.SimpleQueue()
+
+    def reader(pipe, stream):
+        try:
+            for line in pipe:
+                records.put(LogRecord(time.time(), stream, line.rstrip("\r\n")))
+        finally:
+            pipe.close()
+            records.put(None)
+
+    for pipe, stream in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+        threading.Thread(target=reader, args=(pipe, stream), daemon=True).start()
+
+    try:
+        # Espera bloqueante: None marca el cierre de cada flujo
+        open_streams = 2
+        while open_streams:
+            record = records.get()
+            if record is None:
+                open_streams -= 1
+            else:
+                on_record(record)
+        return process.wait()
+    finally:
+        if job is not None:
+            job.detach(process)
+
+
+def run_logged(args, log, stderr_tail=50, tracer=NULL_TRACER, job=None):
+    """Ejecuta un proceso enviando cada línea de salida a ``log``.
+
+    Devuelve el código de salida y las últimas líneas de stderr.
+    """
+    stderr_lines = deque(maxlen=stderr_tail)
+
+    def on_record(record):
+        tracer.count("child_lines")
+        text = record.text.strip()
+        if not text:
+            return
+        if record.stream == "stderr":
+            stderr_lines.append(text)
+            log(f"⚠️ {text}", record.stream, record.timestamp)
+        else:
+            log(f"📄 {text}", record.stream, record.timestamp)
+
+    return_code = run_process(args, on_record, job)
+    return return_code, "\n".join(stderr_lines)
+
+
+class ConsoleLog:
+    """Destino del progreso en modo consola: stdout y, opcionalmente, JSON Lines."""
+
+    def __init__(self, json_path=None):
+        self.json_file = open(json_path, "w", encoding="utf-8") if json_path else None
+
+    def event(self, kind, **fields):
+        if self.json_file:
+            record = {"time": time.time(), "event": kind, **fields}
+            self.json_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.json_file.flush()
+
+    def __call__(self, message, stream="app", timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        output = sys.stderr if stream == "stderr" else sys.stdout
+        print(format_record(LogRecord(timestamp, stream, message)), file=output, flush=True)
+        self.event("log", stream=stream, text=message)
+
+    def progress(self, progress):
+        print(f"📊 {progress.phase} {progress.percent:.0f}% · ETA {format_eta(progress.eta)}", flush=True)
+        self.event("progress", phase=progress.phase, percent=progress.percent, eta=progress.eta)
+
+    def close(self):
+        if self.json_file:
+            self.json_file.close()
+
+
+def mirror_argument(value):
+    if not is_mirror_url(value):
+        import argparse
+        raise argparse.ArgumentTypeError(f"se esperaba http(s)://equipo:puerto, no {value!r}")
+    return value
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Instalador desatendido de Office LTSC.")
+    parser.add_argument("--version", choices=VERSIONS, default="2021")
+    parser.add_argument("--arch", choices=ARCHITECTURES, default="64")
+    parser.add_argument("--language", default="en-us")
+    parser.add_argument("--visio", action="store_true", help="incluir Visio Professional")
+    parser.add_argument("--project", action="store_true", help="incluir Project Professional")
+    parser.add_argument("--include-lync", action="store_true", help="no excluir Skype for Business")
+    parser.add_argument("--config", default=CONFIG_FILE, help="ruta del configuration.xml a generar")
+    parser.add_argument("--json", help="escribir el progreso como JSON Lines en este archivo")
+    parser.add_argument("--cache", action="store_true", help="instalar desde la caché local de orígenes")
+    parser.add_argument("--stage-only", action="store_true", help="solo descargar el origen a la caché")
+    parser.add_argument("--cache-dir", help="directorio de la caché de orígenes")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3,
+                        help="tamaño máximo de la caché en GB")
+    parser.add_argument("--serve-mirror", action="store_true",
+                        help="compartir la caché de orígenes por HTTP en la red local")
+    parser.add_argument("--mirror-port", type=int, default=MIRROR_PORT, help="puerto del espejo HTTP")
+    parser.add_argument("--mirror", type=mirror_argument,
+                        help="instalar desde el espejo de otro equipo (http://equipo:puerto)")
+    parser.add_argument("--delta", action="store_true",
+                        help="agregar solo los productos e idiomas que falten, sin desinstalar")
+    parser.add_argument("--skip-preflight", action="store_true", help="omitir las verificaciones previas")
+    parser.add_argument("--metrics-dir", help="directorio de las trazas y del resumen de ejecuciones")
+    parser.add_argument("--setup-command",
+                        help="comando que reemplaza a setup.exe (por ejemplo, simulador_setup.py)")
+    parser.add_argument("--matrix", metavar="DIR",
+                        help="generar en DIR los XML de todas las versiones, arquitecturas, idiomas y complementos")
+    parser.add_argument("--print-config", action="store_true", help="mostrar el XML y salir sin instalar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.setup_command:
+        os.environ[SETUP_COMMAND_ENV] = args.setup_command
+
+    plan = None
+    if args.delta:
+        plan = plan_selection(
+            args.version, args.arch, args.language, args.visio, args.project, not args.include_lync
+        )
+        print(describe_plan(plan), flush=True)
+        if plan.mode == "none":
+            return 0
+
+    def config_for(source_path=None):
+        if plan and plan.mode == "delta":
+            return build_delta_xml(
+                args.version, args.arch, plan.add,
+                exclude_lync=not args.include_lync, source_path=source_path
+            )
+        return build_config_xml(
+            args.version, args.arch, args.language,
+            visio=args.visio, project=args.project, exclude_lync=not args.include_lync,
+            source_path=source_path
+        )
+
+    if args.matrix:
+        matrix = build_matrix(exclude_lync=not args.include_lync)
+        written = write_matrix(args.matrix, matrix)
+        print(f"🗂️ {len(matrix)} configuraciones; {len(written)} escritas en {args.matrix}")
+        return 0
+
+    if args.print_config:
+        print(config_for())
+        return 0
+
+    if args.serve_mirror:
+        # El servidor HTTP solo se importa si se pide el espejo
+        from espejo import MirrorServer
+
+        server = MirrorServer(SourceCache(args.cache_dir).root, port=args.mirror_port, log=print)
+        print(f"🌐 Espejo de orígenes en http://0.0.0.0:{server.port}/ (Ctrl+C para detener)", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    log = ConsoleLog(args.json)
+    tracer = Tracer("install")
+    return_code = None
+    try:
+        if not is_admin():
+            log("⚠️ Sin permisos de administrador: setup.exe podría fallar")
+
+        if not args.skip_preflight:
+            # Solo preparar el origen no toca la instalación: basta el espacio en disco
+            checks = STAGE_CHECKS if args.stage_only else CHECKS
+            passed, _ = preflight(args.version, args.arch, args.language, log, plan, tracer=tracer, checks=checks)
+            if not passed:
+                log("❌ Las verificaciones previas fallaron; no se instalará nada")
+                log.event("result", return_code=None, error="preflight")
+                return 1
+
+        source_path = None
+        if args.mirror:
+            source_path = mirror_source(args.mirror, args.version, args.arch, [args.language])
+            log(f"🌐 Usando origen del espejo: {source_path}")
+        elif args.cache or args.stage_only:
+            cache = SourceCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
+            source_path = stage_source(cache, args.version, args.arch, [args.language], log, tracer)
+            if args.stage_only:
+                return_code = 0 if source_path else 1
+                log.event("result", return_code=return_code, source_path=source_path)
+                return return_code
+            if source_path is None:
+                log.event("result", return_code=None)
+                return 1
+
+        with tracer.span("config_generation"):
+            xml_content = config_for(source_path)
+        return_code, error_msg = install_office(args.config, xml_content, log, log.progress, tracer)
+        if return_code == 0:
+            log("🎉 ¡Instalación completada con éxito!")
+        elif return_code is not None:
+            log(f"❌ Error durante la instalación (Código {return_code}): {error_msg}")
+        log.event("result", return_code=return_code)
+    except Exception as e:
+        return_code = None
+        log(f"💥 Error inesperado: {str(e)}")
+        log.event("result", return_code=None, error=str(e))
+    finally:
+        tracer.finish(
+            args.metrics_dir, return_code=return_code, mode="cli",
+            version=args.version, architecture=args.arch, language=args.language
+        )
+        log.close()
+
+    return 0 if return_code == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import json
+import os
+import platform
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+STARTUP_TRACE_ENV = "OFFICE_STARTUP_TRACE"
+STARTUP_TRACE_FLAG = "--trace-startup"
+STARTUP_TRACE_FILE = "startup_trace.json"
+
+
+class StartupTrace:
+    """Traza opcional de las fases de arranque, escrita como JSON.
+
+    Se activa con la variable de entorno OFFICE_STARTUP_TRACE (ruta del
+    archivo, o ``1`` para la ruta por defecto) o con ``--trace-startup[=ruta]``.
+    Si no está activa, ``span`` no registra nada.
+    """
+
+    def __init__(self, path=None, start=None):
+        self.path = path
+        self.start = time.perf_counter() if start is None else start
+        self.spans = []
+        self.written = False
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    @classmethod
+    def from_environment(cls, argv, start=None):
+        path = os.environ.get(STARTUP_TRACE_ENV) or None
+        if path == "1":
+            path = STARTUP_TRACE_FILE
+        for arg in argv[1:]:
+            if arg == STARTUP_TRACE_FLAG:
+                path = STARTUP_TRACE_FILE
+            elif arg.startswith(STARTUP_TRACE_FLAG + "="):
+                path = arg.split("=", 1)[1]
+        return cls(path, start)
+
+    def record(self, name, start, end):
+        if self.enabled:
+            self.spans.append((name, start, end))
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def write(self):
+        if not self.enabled or self.written:
+            return
+        self.written = True
+        now = time.perf_counter()
+        data = {
+            "total_ms": round((now - self.start) * 1000, 3),
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round((start - self.start) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                }
+                for name, start, end in self.spans
+            ],
+        }
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError:
+            pass
+
+
+def default_metrics_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "OfficeInstaller", "metrics")
+
+
+class Tracer:
+    """Trazas y métricas de una ejecución de instalación.
+
+    Registra fases (``span``), contadores (``count``) y observaciones como la
+    latencia por línea (``observe``). ``finish`` escribe un archivo compatible
+    con chrome://tracing y agrega una fila de resumen a ``runs.jsonl``. Es
+    seguro usarlo desde varios hilos; si ``enabled`` es False no registra nada.
+    """
+
+    # Máximo de muestras guardadas por observación para calcular percentiles
+    MAX_SAMPLES = 10000
+    # Intervalo mínimo entre muestras de un contador en la traza (segundos)
+    COUNTER_INTERVAL = 0.25
+
+    def __init__(self, name="install", enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.events = []
+        self.spans = {}
+        self.counters = {}
+        self.counter_emitted = {}
+        self.observations = {}
+        self._lock = threading.Lock()
+
+    def now_us(self):
+        return (time.perf_counter() - self.start) * 1e6
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            duration = self.now_us() - start
+            with self._lock:
+                self.events.append({
+                    "name": name, "ph": "X", "ts": start, "dur": duration,
+                    "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+                })
+                self.spans[name] = self.spans.get(name, 0.0) + duration / 1e6
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            value = self.counters.get(name, 0) + amount
+            self.counters[name] = value
+            now = self.now_us()
+            if now - self.counter_emitted.get(name, -1e12) >= self.COUNTER_INTERVAL * 1e6:
+                self.counter_emitted[name] = now
+                self.events.append({
+                    "name": name, "ph": "C", "ts": now, "pid": os.getpid(), "args": {name: value},
+                })
+
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.observations.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "samples": []})
+            stats["count"] += 1
+            stats["total"] += value
+            stats["max"] = max(stats["max"], value)
+            samples = stats["samples"]
+            if len(samples) < self.MAX_SAMPLES:
+                samples.append(value)
+            else:
+                # Muestreo de reservorio: memoria acotada en ejecuciones largas
+                index = random.randrange(stats["count"])
+                if index < self.MAX_SAMPLES:
+                    samples[index] = value
+
+    def summary(self, **extra):
+        with self._lock:
+            row = {
+                "name": self.name,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "host": platform.node(),
+                "platform": platform.platform(),
+                "total_s": round(time.perf_counter() - self.start, 3),
+                "phases_s": {name: round(seconds, 3) for name, seconds in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+            for name, stats in self.observations.items():
+                samples = sorted(stats["samples"])
+                row[name] = {
+                    "count": stats["count"],
+                    "mean": round(stats["total"] / stats["count"], 6),
+                    "p50": round(samples[len(samples) // 2], 6),
+                    "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 6),
+                    "max": round(stats["max"], 6),
+                }
+        child_seconds = row["phases_s"].get("child_process")
+        if child_seconds:
+            row["child_lines_per_s"] = round(row["counters"].get("child_lines", 0) / child_seconds, 1)
+        row.update(extra)
+        return row
+
+    def finish(self, directory=None, **extra):
+        """Escribe la traza de Chrome y el resumen; devuelve la ruta de la traza."""
+        if not self.enabled:
+            return None
+        directory = directory or default_metrics_dir()
+        row = self.summary(**extra)
+        # Milisegundos y PID: dos ejecuciones en el mismo segundo no se pisan
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        millis = int(self.started_at * 1000) % 1000
+        trace_path = os.path.join(directory, f"{self.name}-{stamp}-{millis:03d}-{os.getpid()}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                events = list(self.events)
+            with open(trace_path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": events, "otherData": row}, f)
+            row["trace"] = trace_path
+            with open(os.path.join(directory, "runs.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        except OSError:
+            return None
+        return trace_path
+
+
+# Trazador inactivo para las llamadas que no miden nada
+NULL_TRACER = Tracer(enabled=False)
@@ -0,0 +1,179 @@
+import codecs
+import fnmatch
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+
+# Estado de progreso: fase actual, porcentaje global (0-100) y segundos restantes
+Progress = namedtuple("Progress", ["phase", "percent", "eta"])
+
+# Fases del Office Deployment Tool y tramo del porcentaje global que ocupa cada una
+PHASES = [
+    ("Preparando", ("prereq", "initializ", "validat", "prepar"), 0, 5),
+    ("Descargando", ("download", "stream"), 5, 60),
+    ("Instalando", ("install", "integrat", "apply"), 60, 95),
+    ("Finalizando", ("finaliz", "complet", "success"), 95, 100),
+]
+
+# Marcadores reconocidos en las líneas del log
+PHASE_RE = re.compile(r"(?i)\b(?:phase|stage|state)\b\W*([a-z]+)")
+PERCENT_RE = re.compile(r"(?i)progress[^0-9\n]{0,40}?(\d{1,3}(?:\.\d+)?)\s*%")
+
+
+class LogTailer:
+    """Sigue de forma incremental los archivos de log de un directorio.
+
+    Cada archivo se lee desde el último desplazamiento conocido, de modo que
+    nunca se vuelve a leer lo ya procesado; las líneas incompletas se guardan
+    hasta que llega su final.
+    """
+
+    def __init__(self, directory, pattern="*.log", prefix="", since=None):
+        self.directory = directory
+        self.pattern = pattern
+        self.prefix = prefix.lower()
+        self.since = time.time() if since is None else since
+        self.files = {}
+
+    def discover(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            name = entry.name.lower()
+            if entry.path in self.files or not name.startswith(self.prefix):
+                continue
+            if not fnmatch.fnmatch(name, self.pattern):
+                continue
+            try:
+                if entry.stat().st_mtime < self.since:
+                    continue
+            except OSError:
+                continue
+            self.files[entry.path] = {"offset": 0, "decoder": None, "pending": ""}
+
+    def read_new(self, path, state):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return []
+        if size < state["offset"]:
+            # Archivo truncado o recreado: empezar de nuevo
+            state.update(offset=0, decoder=None, pending="")
+        if size == state["offset"]:
+            return []
+
+        with open(path, "rb") as f:
+            f.seek(state["offset"])
+            data = f.read(size - state["offset"])
+        if state["decoder"] is None:
+            encoding = "utf-16" if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE) else "utf-8-sig"
+            state["decoder"] = codecs.getincrementaldecoder(encoding)(errors="replace")
+        state["offset"] += len(data)
+
+        lines = (state["pending"] + state["decoder"].decode(data)).split("\n")
+        state["pending"] = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+    def poll(self):
+        self.discover()
+        lines = []
+        for path, state in self.files.items():
+            lines.extend(self.read_new(path, state))
+        return lines
+
+
+class ProgressTracker:
+    """Convierte los marcadores de fase y porcentaje del log en progreso global.
+
+    Reconoce líneas como ``Phase: Download`` y ``Progress: 42%``. El
+    porcentaje de cada fase se proyecta sobre su tramo de ``PHASES`` y el
+    progreso global nunca retrocede.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.time() if start is None else start
+        self.phase_index = 0
+        self.percent = 0.0
+
+    @property
+    def phase(self):
+        return PHASES[self.phase_index][0]
+
+    def find_phase(self, name):
+        name = name.lower()
+        for index, (_, keywords, _, _) in enumerate(PHASES):
+            if name.startswith(keywords):
+                return index
+        return None
+
+    def feed(self, line):
+        """Procesa una línea; devuelve True si el progreso visible cambió."""
+        before = (self.phase_index, int(self.percent))
+
+        match = PHASE_RE.search(line)
+        if match:
+            index = self.find_phase(match.group(1))
+            if index is not None and index > self.phase_index:
+                self.phase_index = index
+                self.percent = max(self.percent, PHASES[index][2])
+
+        match = PERCENT_RE.search(line)
+        if match:
+            _, _, low, high = PHASES[self.phase_index]
+            phase_percent = min(float(match.group(1)), 100.0)
+            self.percent = max(self.percent, low + (high - low) * phase_percent / 100)
+
+        return (self.phase_index, int(self.percent)) != before
+
+    def eta(self, now=None):
+        if self.percent < 1:
+            return None
+        elapsed = (time.time() if now is None else now) - self.start
+        return elapsed * (100 - self.percent) / self.percent
+
+    def snapshot(self):
+        return Progress(self.phase, self.percent, self.eta())
+
+
+class ProgressMonitor:
+    """Hilo que sigue los logs del Office Deployment Tool y notifica el progreso."""
+
+    def __init__(self, directory, on_progress, prefix="", interval=0.5):
+        self.tailer = LogTailer(directory, prefix=prefix)
+        self.tracker = ProgressTracker()
+        self.on_progress = on_progress
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def poll(self):
+        changed = False
+        for line in self.tailer.poll():
+            changed = self.tracker.feed(line) or changed
+        if changed:
+            self.on_progress(self.tracker.snapshot())
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        # Última lectura para no perder las líneas finales
+        self.poll()
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "calculando..."
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,465 @@
+import glob
+import itertools
+import json
+import os
+import queue
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+
+# Registro individual del log: marca de tiempo, origen y texto
+LogRecord = namedtuple("LogRecord", ["timestamp", "stream", "text"])
+
+
+# Registro persistente de la sesión: incluye la fase de la instalación en curso
+SessionRecord = namedtuple("SessionRecord", ["timestamp", "phase", "stream", "text"])
+
+
+# Clase de cada mensaje según el emoji con que empieza; el resto es "info"
+LEVEL_PREFIXES = [
+    ("error", ("❌", "💥")),
+    ("warning", ("⚠️", "⛔")),
+    ("success", ("✅", "🎉")),
+    ("output", ("📄",)),
+]
+
+# Palabras indexadas para la búsqueda
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+
+# Marca de tiempo que format_record antepone a la primera línea de cada registro
+TIMESTAMP_PREFIX = re.compile(r"^\[\d\d:\d\d:\d\d\] ")
+
+
+# Filtro de la vista del registro: clases, orígenes y texto buscado (vacío = todo)
+LogFilter = namedtuple("LogFilter", ["levels", "streams", "query"], defaults=(frozenset(), frozenset(), ""))
+
+
+def format_record(record):
+    """Formatea un registro como línea del log con su hora local."""
+    timestamp = time.strftime("%H:%M:%S", time.localtime(record.timestamp))
+    return f"[{timestamp}] {record.text}"
+
+
+def classify(text):
+    text = text.lstrip()
+    for level, prefixes in LEVEL_PREFIXES:
+        if text.startswith(prefixes):
+            return level
+    return "info"
+
+
+class LogSink:
+    """Cola segura entre hilos para los mensajes del registro de actividad.
+
+    Los hilos de trabajo solo encolan registros; el hilo de Tk los vacía
+    por lotes desde un temporizador.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def push(self, text, stream="app", timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        self._queue.put(LogRecord(timestamp, stream, text))
+
+    def drain(self, limit=None):
+        records = []
+        try:
+            while limit is None or len(records) < limit:
+                records.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return records
+
+    def clear(self):
+        self.drain()
+
+
+class LogStore:
+    """Almacén acotado del registro con volcado a disco en segmentos rotativos.
+
+    Cada línea se guarda en un segmento de ``segment_lines`` líneas y solo se
+    conservan los ``max_segments`` más recientes, de modo que la vista puede
+    releer cualquier rango reciente sin mantenerlo en memoria.
+    """
+
+    def __init__(self, directory=None, segment_lines=5000, max_segments=20):
+        self.directory = directory
+        self._owns_directory = directory is None
+        self.segment_lines = segment_lines
+        self.max_segments = max_segments
+        self.total = 0
+        self._first_segment = 0
+        self._file = None
+
+    @property
+    def first_available(self):
+        return self._first_segment * self.segment_lines
+
+    def _segment_path(self, index):
+        return os.path.join(self.directory, f"log_{index:06d}.txt")
+
+    def _open_segment(self, index):
+        if self._file:
+            self._file.close()
+        if self.directory is None:
+            import tempfile
+            self.directory = tempfile.mkdtemp(prefix="office_log_")
+        self._file = open(self._segment_path(index), "w", encoding="utf-8", errors="replace")
+
+        # Eliminar los segmentos que exceden la retención
+        while index - self._first_segment >= self.max_segments:
+            try:
+                os.remove(self._segment_path(self._first_segment))
+            except OSError:
+                pass
+            self._first_segment += 1
+
+    def append(self, lines):
+        position = 0
+        while position < len(lines):
+            offset = self.total % self.segment_lines
+            if offset == 0:
+                self._open_segment(self.total // self.segment_lines)
+            chunk = lines[position:position + self.segment_lines - offset]
+            self._file.write("\n".join(chunk) + "\n")
+            self.total += len(chunk)
+            position += len(chunk)
+        if self._file:
+            self._file.flush()
+
+    def read(self, start, end):
+        start = max(start, self.first_available)
+        end = min(end, self.total)
+        lines = []
+        if start >= end:
+            return lines
+        for index in range(start // self.segment_lines, (end - 1) // self.segment_lines + 1):
+            base = index * self.segment_lines
+            with open(self._segment_path(index), encoding="utf-8", errors="replace") as f:
+                for line in itertools.islice(f, max(start - base, 0), end - base):
+                    lines.append(line.rstrip("\n"))
+        return lines
+
+    def read_lines(self, numbers):
+        """Devuelve ``(número, línea)`` de los números indicados, en orden ascendente.
+
+        Cada segmento se abre una sola vez aunque se pidan muchas líneas de él.
+        """
+        numbers = [n for n in numbers if self.first_available <= n < self.total]
+        result = []
+        for index, group in itertools.groupby(numbers, key=lambda n: n // self.segment_lines):
+            base = index * self.segment_lines
+            wanted = [n - base for n in group]
+            with open(self._segment_path(index), encoding="utf-8", errors="replace") as f:
+                lines = list(itertools.islice(f, wanted[0], wanted[-1] + 1))
+            result.extend((base + offset, lines[offset - wanted[0]].rstrip("\n")) for offset in wanted)
+        return result
+
+    def reset(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.directory:
+            for index in range(self._first_segment, self.total // self.segment_lines + 1):
+                try:
+                    os.remove(self._segment_path(index))
+                except OSError:
+                    pass
+        self.total = 0
+        self._first_segment = 0
+
+    def close(self):
+        self.reset()
+        if self._owns_directory and self.directory:
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                pass
+            self.directory = None
+
+
+class LogIndex:
+    """Índice incremental del registro por clase, origen y palabra.
+
+    Cada línea se identifica por su número en el ``LogStore``. Las listas de
+    números crecen ordenadas al agregar, así que los filtros se responden
+    combinando listas sin releer el texto ni el widget. Las palabras buscadas
+    se comparan por prefijo con el vocabulario; una expresión regular solo
+    relee del almacén las líneas que ya pasaron los demás filtros.
+    """
+
+    def __init__(self, compact_every=20000):
+        self.compact_every = compact_every
+        self.reset()
+
+    def reset(self):
+        self.levels = {}
+        self.streams = {}
+        self.tokens = {}
+        self.first = 0
+        self._compacted = 0
+        self._vocabulary = None
+
+    def add(self, number, record):
+        """Indexa ``record``, cuyas líneas empiezan en el número ``number``."""
+        level = self.levels.setdefault(classify(record.text), array("I"))
+        stream = self.streams.setdefault(record.stream, array("I"))
+        tokens = self.tokens
+        lines = record.text.split("\n")
+        for number, line in enumerate(lines, number):
+            level.append(number)
+            stream.append(number)
+            for token in TOKEN_PATTERN.findall(line.lower()):
+                postings = tokens.get(token)
+                if postings is None:
+                    postings = tokens[token] = array("I")
+                    self._vocabulary = None
+                elif postings[-1] == number:
+                    # Palabra repetida en la misma línea
+                    continue
+                postings.append(number)
+        return len(lines)
+
+    def discard_before(self, number):
+        """Olvida las líneas anteriores a ``number``, que el almacén ya eliminó."""
+        if number <= self.first:
+            return
+        self.first = number
+        # Recortar las listas solo cuando lo descartado es una parte apreciable
+        if number - self._compacted < self.compact_every:
+            return
+        self._compacted = number
+        for table in (self.levels, self.streams, self.tokens):
+            for key in list(table):
+                postings = table[key]
+                start = bisect_left(postings, number)
+                if start == len(postings):
+                    del table[key]
+                elif start:
+                    table[key] = postings[start:]
+        self._vocabulary = None
+
+    def _union(self, table, keys, start):
+        numbers = set()
+        for key in keys:
+            postings = table.get(key)
+            if postings:
+                numbers.update(postings[bisect_left(postings, start):])
+        return numbers
+
+    def _word_matches(self, word, start):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.tokens)
+        vocabulary = self._vocabulary
+        keys = []
+        for position in range(bisect_left(vocabulary, word), len(vocabulary)):
+            if not vocabulary[position].startswith(word):
+                break
+            keys.append(vocabulary[position])
+        return self._union(self.tokens, keys, start)
+
+    def search(self, log_filter, store, start=None):
+        """Números de línea que cumplen ``log_filter``, en orden ascendente.
+
+        Sin ``start`` se recorre todo lo indexado; con ``start`` solo las líneas
+        nuevas desde ese número, que se comprueban sobre su texto. Una consulta
+        con caracteres especiales es una expresión regular (sin distinguir
+        mayúsculas) que se aplica a la línea tal como se muestra; si no es
+        válida se lanza ``re.error``.
+        """
+        query = log_filter.query.strip()
+        words = query.lower().split() if re.fullmatch(r"[\w\s]*", query) else None
+        pattern = None if words is not None else re.compile(query, re.IGNORECASE)
+        incremental = start is not None
+        start = max(start or 0, self.first, store.first_available)
+
+        numbers = None
+        for table, keys in ((self.levels, log_filter.levels), (self.streams, log_filter.streams)):
+            if keys:
+                found = self._union(table, keys, start)
+                numbers = found if numbers is None else numbers & found
+        if words and not incremental:
+            for word in words:
+                found = self._word_matches(word, start)
+                numbers = found if numbers is None else numbers & found
+            words = None
+
+        numbers = range(start, store.total) if numbers is None else sorted(numbers)
+        if not words and pattern is None:
+            return list(numbers)
+
+        lines = store.read_lines(numbers)
+        if pattern is not None:
+            return [number for number, line in lines if pattern.search(line)]
+        matches = []
+        for number, line in lines:
+            tokens = TOKEN_PATTERN.findall(TIMESTAMP_PREFIX.sub("", line, count=1).lower())
+            if all(any(token.startswith(word) for token in tokens) for word in words):
+                matches.append(number)
+        return matches
+
+
+def default_session_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "OfficeInstaller", "logs")
+
+
+def gzip_file(path):
+    """Comprime ``path`` a ``path.gz`` y elimina el original."""
+    import gzip
+    import shutil
+
+    with open(path, "rb") as source, gzip.open(path + ".gz.tmp", "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.replace(path + ".gz.tmp", path + ".gz")
+    os.remove(path)
+
+
+class SessionLog:
+    """Escribe el registro completo de la sesión como JSON Lines en segundo plano.
+
+    ``write`` solo encola; un hilo escribe por lotes y vacía a disco cada
+    ``flush_interval`` segundos. Al superar ``max_bytes`` el archivo se rota y
+    las partes terminadas se comprimen con gzip. La cola está acotada: si se
+    llena, los hilos de trabajo esperan hasta ``max_wait`` segundos (frenando
+    así al proceso hijo) y el hilo de Tk nunca espera; lo que no cabe se
+    descarta y queda contado en el archivo.
+    """
+
+    def __init__(self, directory=None, max_queue=50000, batch_max=2000, flush_interval=0.5,
+                 max_bytes=50 * 1024 ** 2, max_archives=30, max_wait=0.5, stale_after=3600):
+        self.directory = directory or default_session_dir()
+        self.batch_max = batch_max
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_archives = max_archives
+        self.max_wait = max_wait
+        self.stale_after = stale_after
+        self.name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.part = 0
+        self.path = None
+        self.phase = None
+        self.dropped = 0
+        self.written = 0
+        self._reported_dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._size = 0
+        self._thread = threading.Thread(target=self.run, name="session-log", daemon=True)
+
+    @property
+    def archive_path(self):
+        """Ruta final de la parte actual, que se comprime al rotar o al cerrar."""
+        return self.path + ".gz" if self.path else None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def write(self, text, stream="app", timestamp=None, block=True):
+        """Encola un registro; devuelve False si se descartó por la cola llena."""
+        record = SessionRecord(time.time() if timestamp is None else timestamp, self.phase, stream, text)
+        try:
+            self._queue.put(record, block=block, timeout=self.max_wait if block else None)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _open_part(self):
+        self.part += 1
+        self.path = os.path.join(self.directory, f"{self.name}-{self.part:03d}.jsonl")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    def _finish_part(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            gzip_file(self.path)
+        except OSError:
+            pass
+
+    def _write_batch(self, records):
+        if self.dropped != self._reported_dropped:
+            # Marca visible de los registros descartados por la contrapresión
+            lost = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            records.append(SessionRecord(time.time(), self.phase, "app", f"⚠️ {lost} líneas descartadas"))
+        if self._file is None:
+            self._open_part()
+        data = "".join(
+            json.dumps(record._asdict(), ensure_ascii=False) + "\n" for record in records
+        )
+        self._file.write(data)
+        # max_bytes se mide en bytes: el texto UTF-8 con emoji ocupa más que sus caracteres
+        self._size += len(data.encode("utf-8"))
+        self.written += len(records)
+        if self._size >= self.max_bytes:
+            self._finish_part()
+
+    def run(self):
+        self.archive_previous()
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            records = []
+            try:
+                record = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if record is None:
+                        stopping = True
+                        break
+                    records.append(record)
+                    if len(records) >= self.batch_max:
+                        break
+                    record = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                if records or self.dropped != self._reported_dropped:
+                    self._write_batch(records)
+                if self._file and (stopping or time.monotonic() - last_flush >= self.flush_interval):
+                    self._file.flush()
+                    last_flush = time.monotonic()
+            except OSError:
+                # Disco lleno o sin permisos: el registro se pierde, la interfaz sigue
+                self.dropped += len(records)
+                self._reported_dropped = self.dropped
+        self._finish_part()
+
+    def archive_previous(self):
+        """Comprime las sesiones que quedaron sin cerrar y poda las más antiguas."""
+        for path in glob.glob(os.path.join(self.directory, "session-*.jsonl")):
+            # Una sesión modificada hace poco puede ser de otra ventana abierta
+            try:
+                if time.time() - os.path.getmtime(path) < self.stale_after:
+                    continue
+                gzip_file(path)
+            except OSError:
+                pass
+        archives = sorted(glob.glob(os.path.join(self.directory, "session-*.jsonl.gz")))
+        for path in archives[:max(0, len(archives) - self.max_archives)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self, timeout=5.0):
+        """Escribe lo pendiente, comprime la sesión y detiene el hilo."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
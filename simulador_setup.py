@@ -0,0 +1,160 @@
+"""Simulador del Office Deployment Tool (setup.exe) para pruebas de carga.
+
+Acepta los mismos argumentos que setup.exe (``/configure`` o ``/download`` y
+la ruta del XML), escribe un log con los marcadores ``Phase:`` y ``Progress:``
+en %temp% como el ODT real, emite líneas por stdout y stderr al ritmo pedido y
+termina con el código indicado. Se usa en lugar de setup.exe con:
+
+    OFFICE_SETUP_COMMAND="python simulador_setup.py --stdout-rate 20000" python instalador.py
+    python instalador.py --setup-command "python simulador_setup.py --fail-at 70 --exit-code 17"
+"""
+import os
+import platform
+import sys
+import tempfile
+import time
+
+
+# Fases del ODT simuladas: nombre en el log y fracción de la duración total
+PHASES = [
+    ("Initialize", 0.05),
+    ("Download", 0.45),
+    ("Install", 0.40),
+    ("Finalize", 0.10),
+]
+
+# Cada cuánto se emite un lote de líneas y se actualiza el log (segundos)
+TICK = 0.01
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulador de setup.exe del Office Deployment Tool.")
+    parser.add_argument("mode", nargs="?", default="/configure", help="/configure o /download")
+    parser.add_argument("config", nargs="?", help="ruta del XML de configuración")
+    parser.add_argument("--duration", type=float, default=5.0, help="duración total en segundos")
+    parser.add_argument("--stdout-rate", type=float, default=50.0,
+                        help="líneas por segundo en stdout (0 = sin límite durante la duración)")
+    parser.add_argument("--stderr-rate", type=float, default=0.0, help="líneas por segundo en stderr")
+    parser.add_argument("--line-size", type=int, default=80, help="caracteres por línea emitida")
+    parser.add_argument("--max-lines", type=int, help="detenerse tras emitir estas líneas por stdout")
+    parser.add_argument("--exit-code", type=int, default=0, help="código de salida al terminar o fallar")
+    parser.add_argument("--fail-at", type=float, help="terminar de golpe al llegar a este porcentaje")
+    parser.add_argument("--hang-at", type=float, help="quedarse colgado al llegar a este porcentaje")
+    parser.add_argument("--log-dir", default=tempfile.gettempdir(), help="directorio del log simulado")
+    parser.add_argument("--log-prefix", default=os.environ.get("COMPUTERNAME") or platform.node(),
+                        help="prefijo del log (el ODT usa el nombre del equipo)")
+    return parser.parse_args(argv)
+
+
+def make_line(prefix, number, size):
+    text = f"{prefix} {number:08d} "
+    return (text + "x" * max(0, size - len(text)))[:max(size, len(text))]
+
+
+class SimulatedLog:
+    """Log del ODT simulado con el formato de marcas de tiempo del original."""
+
+    def __init__(self, directory, prefix):
+        stamp = time.strftime("%Y%m%d-%H%M")
+        self.path = os.path.join(directory, f"{prefix}-{stamp}{os.getpid() % 1000:03d}.log")
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.phase = None
+        self.percent = -1
+
+    def write(self, message):
+        now = time.time()
+        stamp = time.strftime("%m/%d/%Y %H:%M:%S", time.localtime(now))
+        self.file.write(f"{stamp}.{int(now * 1000) % 1000:03d}\tSETUP (0x{os.getpid():x})\t{message}\n")
+
+    def update(self, phase, percent):
+        if phase != self.phase:
+            self.phase = phase
+            self.percent = -1
+            self.write(f"Phase: {phase}")
+        if int(percent) != self.percent:
+            self.percent = int(percent)
+            self.write(f"{phase} Progress: {self.percent}%")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def phase_at(fraction):
+    """Fase y porcentaje dentro de la fase para una fracción de la duración."""
+    start = 0.0
+    for name, weight in PHASES:
+        if fraction < start + weight:
+            return name, (fraction - start) / weight * 100
+        start += weight
+    return PHASES[-1][0], 100.0
+
+
+def run(args):
+    log = SimulatedLog(args.log_dir, args.log_prefix)
+    log.write(f"Command line: setup.exe {args.mode} {args.config or ''}".rstrip())
+    stdout_count = stderr_count = 0
+    start = time.monotonic()
+    try:
+        while True:
+            elapsed = time.monotonic() - start
+            fraction = min(elapsed / args.duration, 1.0) if args.duration > 0 else 1.0
+            overall = fraction * 100
+            phase, percent = phase_at(fraction)
+            log.update(phase, percent)
+
+            if args.fail_at is not None and overall >= args.fail_at:
+                log.write(f"Error: simulated failure at {overall:.0f}%")
+                log.close()
+                sys.stdout.flush()
+                sys.stderr.write(f"Simulated failure during {phase} (0x{args.exit_code:x})\n")
+                sys.stderr.flush()
+                # Salida abrupta, sin vaciar nada más, como un proceso que se cae
+                os._exit(args.exit_code)
+            if args.hang_at is not None and overall >= args.hang_at:
+                log.write(f"{phase}: waiting for a response...")
+                log.file.flush()
+                sys.stdout.flush()
+                while True:
+                    time.sleep(3600)
+
+            if args.stdout_rate > 0:
+                due = int(elapsed * args.stdout_rate)
+            else:
+                due = stdout_count + 1000
+            if args.max_lines is not None:
+                due = min(due, args.max_lines)
+            lines = [make_line(phase, n, args.line_size) for n in range(stdout_count, due)]
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                stdout_count = due
+
+            due = int(elapsed * args.stderr_rate)
+            lines = [make_line(f"{phase} warning", n, args.line_size) for n in range(stderr_count, due)]
+            if lines:
+                sys.stderr.write("\n".join(lines) + "\n")
+                stderr_count = due
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if fraction >= 1.0 or (args.max_lines is not None and stdout_count >= args.max_lines):
+                break
+            if args.stdout_rate > 0:
+                time.sleep(TICK)
+
+        log.update(PHASES[-1][0], 100)
+        log.write(f"Finalize: exit code {args.exit_code}")
+    finally:
+        if not log.file.closed:
+            log.close()
+    return args.exit_code
+
+
+def main(argv=None):
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Plan de instalación a partir de un registro de Click-to-Run falso."""
+import instalador
+from deteccion import detect_installed, plan_install
+
+
+def registry(products, culture="es-es", platform="x64", excluded="lync"):
+    # Cualquier objeto con get(nombre) sirve de registro: un dict basta
+    values = {"ProductReleaseIds": products, "ClientCulture": culture, "Platform": platform}
+    for pid in products.split(","):
+        values[f"{pid.strip()}.ExcludedApps"] = excluded
+    return values
+
+
+def test_nothing_installed_is_full_install():
+    plan = instalador.plan_selection("2021", "64", "es-es", registry={})
+    assert plan.mode == "full"
+    assert plan.add == [("ProPlus2021Volume", "es-es")]
+
+
+def test_detect_installed_reads_products_language_and_architecture():
+    installed = detect_installed(registry("ProPlus2021Volume, VisioPro2021Volume", "ES-ES", "x86"))
+    assert installed.products == {"ProPlus2021Volume", "VisioPro2021Volume"}
+    assert installed.languages == {"es-es"}
+    assert installed.architecture == "32"
+
+
+def test_addon_only_is_delta():
+    plan = instalador.plan_selection("2021", "64", "es-es", visio=True, registry=registry("ProPlus2021Volume"))
+    assert plan.mode == "delta"
+    assert plan.add == [("VisioPro2021Volume", "es-es")]
+
+
+def test_everything_installed_is_none():
+    plan = instalador.plan_selection("2021", "64", "es-es", registry=registry("ProPlus2021Volume"))
+    assert plan.mode == "none"
+    assert plan.add == []
+
+
+def test_other_lync_exclusion_is_delta():
+    plan = instalador.plan_selection("2021", "64", "es-es", registry=registry("ProPlus2021Volume", excluded="groove"))
+    assert plan.mode == "delta"
+    assert plan.add == [("ProPlus2021Volume", "es-es")]
+    plan = instalador.plan_selection(
+        "2021", "64", "es-es", exclude_lync=False, registry=registry("ProPlus2021Volume", excluded="groove")
+    )
+    assert plan.mode == "none"
+
+
+def test_new_language_is_delta():
+    plan = instalador.plan_selection("2021", "64", "en-us", registry=registry("ProPlus2021Volume"))
+    assert plan.mode == "delta"
+    assert plan.add == [("ProPlus2021Volume", "en-us")]
+
+
+def test_other_architecture_is_full():
+    plan = instalador.plan_selection("2021", "64", "es-es", registry=registry("ProPlus2021Volume", platform="x86"))
+    assert plan.mode == "full"
+
+
+def test_other_version_is_full():
+    plan = instalador.plan_selection("2021", "64", "es-es", registry=registry("ProPlus2019Volume"))
+    assert plan.mode == "full"
+    assert "ProPlus2019Volume" in plan.reason
+
+
+def test_plan_install_without_detection():
+    assert plan_install(["ProPlus2021Volume"], "es-es", "64", None).mode == "full"
@@ -0,0 +1,59 @@
+"""Espejo HTTP de la caché de orígenes, contra un servidor en localhost."""
+import http.client
+
+import pytest
+
+from espejo import MirrorServer
+
+CONTENT = b"0123456789"
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    root = tmp_path_factory.mktemp("cache")
+    (root / "origen").mkdir()
+    (root / "origen" / "data.cab").write_bytes(CONTENT)
+    (root / "origen" / "data.cab.partial").write_bytes(CONTENT)
+    server = MirrorServer(str(root), host="127.0.0.1", port=0).start()
+    yield server
+    server.stop()
+
+
+def get(server, path, headers=None, method="GET"):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("header, status, body, content_range", [
+    (None, 200, CONTENT, None),
+    ("bytes=2-5", 206, b"2345", "bytes 2-5/10"),
+    ("bytes=7-", 206, b"789", "bytes 7-9/10"),
+    ("bytes=-3", 206, b"789", "bytes 7-9/10"),
+    ("bytes=8-100", 206, b"89", "bytes 8-9/10"),
+    ("bytes=5-2", 200, CONTENT, None),
+    ("bytes=0-1,4-5", 200, CONTENT, None),
+    ("bytes=20-", 416, b"", "bytes */10"),
+])
+def test_ranges(server, header, status, body, content_range):
+    headers = {"Range": header} if header else {}
+    code, response_headers, data = get(server, "/origen/data.cab", headers)
+    assert code == status
+    assert data == body
+    assert response_headers.get("Content-Range") == content_range
+
+
+def test_head_sends_no_body(server):
+    code, headers, data = get(server, "/origen/data.cab", method="HEAD")
+    assert code == 200
+    assert headers["Content-Length"] == str(len(CONTENT))
+    assert data == b""
+
+
+@pytest.mark.parametrize("path", ["/origen/data.cab.partial", "/../etc/passwd", "/origen/missing.cab"])
+def test_rejected_paths(server, path):
+    assert get(server, path)[0] == 404
@@ -0,0 +1,32 @@
+"""Encadenado de trabajos: cada paso espera al anterior y solo sigue si terminó bien."""
+from trabajos import CANCELLED, DONE, FAILED, JobExecutor
+
+
+def run_chain(first):
+    finished = []
+    executor = JobExecutor()
+    verify = executor.submit("verify", first)
+    stage = executor.submit("stage_source", lambda job: "/origen", after=verify)
+    install = executor.submit(
+        "install", lambda job: stage.result, after=stage, on_finish=finished.append
+    )
+    assert executor.wait(timeout=5)
+    executor.shutdown()
+    return verify, stage, install, finished
+
+
+def test_chain_passes_results_along():
+    verify, stage, install, finished = run_chain(lambda job: True)
+    assert [verify.state, stage.state, install.state] == [DONE, DONE, DONE]
+    assert install.result == "/origen"
+    assert finished == [install]
+
+
+def test_failed_step_skips_the_rest_and_still_finishes():
+    def fail(job):
+        raise RuntimeError("sin espacio")
+
+    verify, stage, install, finished = run_chain(fail)
+    assert [verify.state, stage.state, install.state] == [FAILED, CANCELLED, CANCELLED]
+    assert not stage.cancel_requested
+    assert finished == [install]
@@ -0,0 +1,64 @@
+"""Lectura simultánea de stdout y stderr de procesos hijos (instalador.run_process)."""
+import os
+import sys
+import threading
+
+import instalador
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATOR = os.path.join(ROOT, "simulador_setup.py")
+
+# Hijo que inunda las dos tuberías a la vez, sin esperar a que se lean
+FLOOD = """
+import sys
+line = "x" * 100 + "\\n"
+for _ in range({lines} // 1000):
+    sys.stdout.write(line * 1000)
+    sys.stderr.write(line * 1000)
+sys.exit(3)
+"""
+
+
+def run_with_timeout(func, timeout=60):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "el proceso hijo quedó bloqueado"
+    return result["value"]
+
+
+def test_flood_both_pipes_does_not_hang():
+    lines = 200000
+    counts = {"stdout": 0, "stderr": 0}
+
+    def on_record(record):
+        counts[record.stream] += 1
+
+    code = run_with_timeout(
+        lambda: instalador.run_process([sys.executable, "-c", FLOOD.format(lines=lines)], on_record)
+    )
+    assert code == 3
+    assert counts == {"stdout": lines, "stderr": lines}
+
+
+def test_simulator_flood_is_fully_logged(tmp_path):
+    messages = []
+    command = [sys.executable, SIMULATOR, "--duration", "0.5", "--stdout-rate", "0", "--max-lines", "50000",
+               "--stderr-rate", "20000", "--log-dir", str(tmp_path)]
+
+    code, stderr_tail = run_with_timeout(
+        lambda: instalador.run_logged(command, lambda text, stream="app", timestamp=None: messages.append(stream))
+    )
+    assert code == 0
+    assert messages.count("stdout") == 50000
+    assert messages.count("stderr") > 0
+    assert stderr_tail
+
+
+def test_simulator_failure_exit_code(tmp_path):
+    command = [sys.executable, SIMULATOR, "--duration", "0.2", "--fail-at", "50", "--exit-code", "17",
+               "--log-dir", str(tmp_path)]
+    code, stderr_tail = run_with_timeout(lambda: instalador.run_logged(command, lambda *args, **kwargs: None))
+    assert code == 17
+    assert "Simulated failure" in stderr_tail
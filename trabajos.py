@@ -0,0 +1,213 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Tipos de trabajo aceptados y su nombre para mostrar
+JOB_KINDS = {
+    "verify": "Verificar",
+    "stage_source": "Preparar origen",
+    "install": "Instalar",
+    "activate": "Activar",
+}
+
+# Estados de un trabajo
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+STATE_ICONS = {QUEUED: "⏳", RUNNING: "▶️", DONE: "✅", FAILED: "❌", CANCELLED: "⛔"}
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """El trabajo se canceló; se lanza al comprobar ``Job.check_cancelled``."""
+
+
+class JobFailed(Exception):
+    """El trabajo falló y el error ya se mostró al usuario."""
+
+
+def kill_process_tree(process):
+    """Termina ``process`` y todos sus descendientes de inmediato."""
+    if process.poll() is not None:
+        return
+    if os.name == "nt":
+        import subprocess
+        # setup.exe lanza otros procesos: /T termina el árbol completo
+        subprocess.run(
+            ["taskkill", "/PID", str(process.pid), "/T", "/F"],
+            capture_output=True,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+    else:
+        import signal
+        # El hijo se inició en su propia sesión: su grupo es el árbol completo
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+
+
+class Job:
+    """Operación en segundo plano con estado observable y cancelable.
+
+    ``func`` recibe el propio trabajo para poder comprobar la cancelación y
+    asociar los procesos hijos que lance (``attach``), que se terminan al
+    cancelar.
+
+    Con ``after`` el trabajo solo se ejecuta si ese otro terminó bien; si no,
+    se da por cancelado sin ejecutarse. ``on_finish`` se llama una sola vez
+    cuando el trabajo llega a un estado final, se haya ejecutado o no.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, func, label=None, after=None, on_finish=None):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+        self.id = next(self._ids)
+        self.kind = kind
+        self.label = label or JOB_KINDS[kind]
+        self.func = func
+        self.after = after
+        self.on_finish = on_finish
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._process = None
+        self._finish_called = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def attach(self, process):
+        """Asocia el proceso hijo en curso; si ya se canceló, lo termina."""
+        with self._lock:
+            self._process = process
+        if self._cancel.is_set():
+            kill_process_tree(process)
+
+    def detach(self, process):
+        with self._lock:
+            if self._process is process:
+                self._process = None
+
+    def cancel(self):
+        """Cancela el trabajo: si está en cola no llega a ejecutarse."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.state = CANCELLED
+            self.finished = time.time()
+        with self._lock:
+            process = self._process
+        if process is not None:
+            kill_process_tree(process)
+
+    def describe(self):
+        return f"{STATE_ICONS[self.state]} #{self.id} {self.label}"
+
+
+class JobExecutor:
+    """Ejecuta trabajos en orden con un límite de concurrencia.
+
+    Con ``max_workers=1`` los trabajos se ejecutan uno tras otro en el orden
+    en que se enviaron. ``on_change`` se llama desde el hilo del trabajo cada
+    vez que uno cambia de estado.
+    """
+
+    def __init__(self, max_workers=1, on_change=None, history=20):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.on_change = on_change
+        self.history = history
+        self._jobs = []
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, label=None, after=None, on_finish=None):
+        job = Job(kind, func, label, after, on_finish)
+        with self._lock:
+            self._jobs.append(job)
+            # Se conservan todos los activos y los últimos terminados
+            finished = [j for j in self._jobs if j.state not in (QUEUED, RUNNING)]
+            for old in finished[:max(0, len(finished) - self.history)]:
+                self._jobs.remove(old)
+        self._notify(job)
+        job.future = self.executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        if job.after is not None:
+            from concurrent.futures import wait
+
+            # Encadenado: solo se ejecuta si el anterior terminó bien
+            wait([job.after.future])
+        if job.cancel_requested or (job.after is not None and job.after.state != DONE):
+            job.state = CANCELLED
+            job.finished = time.time()
+            self._notify(job)
+            return None
+        job.state = RUNNING
+        job.started = time.time()
+        self._notify(job)
+        try:
+            job.result = job.func(job)
+            job.state = CANCELLED if job.cancel_requested else DONE
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.state = FAILED
+        finally:
+            job.finished = time.time()
+            self._notify(job)
+        return job.result
+
+    def _notify(self, job):
+        if self.on_change:
+            self.on_change(job)
+        if job.state in FINAL_STATES and job.on_finish:
+            with job._lock:
+                if job._finish_called:
+                    return
+                job._finish_called = True
+            job.on_finish(job)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def active(self):
+        return [job for job in self.jobs() if job.state in (QUEUED, RUNNING)]
+
+    def cancel(self, job):
+        job.cancel()
+        # Un trabajo en cola cancelado no llega a ejecutarse: se avisa aquí
+        if job.state == CANCELLED:
+            self._notify(job)
+
+    def cancel_all(self):
+        for job in self.active():
+            self.cancel(job)
+
+    def wait(self, timeout=None):
+        """Espera a que terminen los trabajos activos; False si vence ``timeout``."""
+        from concurrent.futures import wait
+
+        futures = [job.future for job in self.active() if job.future is not None]
+        return not wait(futures, timeout).not_done
+
+    def shutdown(self, cancel=False):
+        if cancel:
+            self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=cancel)
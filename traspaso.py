@@ -0,0 +1,156 @@
+"""Traspaso de la operación pendiente y ejecución en una sola instancia.
+
+Al reiniciar con permisos de administrador, la selección y la operación
+pedida viajan en un archivo de estado (``--handoff=ruta``) y el nuevo proceso
+la retoma nada más arrancar. Una instancia abierta escucha en un puerto local
+para que un segundo lanzamiento le reenvíe su petición en lugar de abrir otra
+ventana.
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+
+HANDOFF_FLAG = "--handoff"
+
+# Prefijo de los archivos de traspaso que crea write_handoff
+HANDOFF_PREFIX = "office_handoff_"
+
+# Un traspaso más antiguo se descarta (segundos)
+HANDOFF_MAX_AGE = 120
+
+# Archivo en %TEMP% con el puerto y el token de la instancia abierta
+INSTANCE_NAME = "office_installer_instance.json"
+
+
+def instance_file():
+    # tempfile se importa y el directorio temporal se busca solo al usarlos
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), INSTANCE_NAME)
+
+
+def write_handoff(operation, selection):
+    """Guarda la operación pendiente y la selección; devuelve la ruta del archivo."""
+    import tempfile
+
+    # mkstemp crea el archivo legible solo por el usuario actual
+    fd, path = tempfile.mkstemp(prefix=HANDOFF_PREFIX, suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"operation": operation, "selection": selection, "created": time.time()}, f)
+    return path
+
+
+def is_handoff_file(path):
+    """True si ``path`` es un archivo de traspaso de write_handoff en %TEMP%."""
+    import tempfile
+
+    directory, name = os.path.split(os.path.abspath(path))
+    return (
+        name.startswith(HANDOFF_PREFIX) and name.endswith(".json")
+        and os.path.normcase(directory) == os.path.normcase(os.path.abspath(tempfile.gettempdir()))
+    )
+
+
+def read_handoff(argv):
+    """Lee y elimina el traspaso indicado en ``argv``; ``None`` si no hay uno válido.
+
+    Solo se aceptan archivos creados por write_handoff y se borran únicamente
+    si se pudieron leer: el proceso elevado no elimina otros archivos que
+    lleguen por la línea de comandos.
+    """
+    path = None
+    for arg in argv[1:]:
+        if arg.startswith(HANDOFF_FLAG + "="):
+            path = arg.split("=", 1)[1]
+    if path is None or not is_handoff_file(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict):
+        return None
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    if time.time() - state.get("created", 0) > HANDOFF_MAX_AGE:
+        return None
+    return state
+
+
+def strip_handoff(argv):
+    return [arg for arg in argv if not arg.startswith(HANDOFF_FLAG + "=")]
+
+
+class InstanceServer:
+    """Recibe por un socket local las peticiones de otros lanzamientos.
+
+    El puerto y un token aleatorio se publican en ``instance_file()``; solo se
+    aceptan peticiones con ese token. ``on_request`` se llama desde el hilo
+    del servidor con el dict recibido.
+    """
+
+    def __init__(self, on_request, path=None):
+        self.on_request = on_request
+        self.path = path or instance_file()
+        self.token = os.urandom(16).hex()
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.socket.listen(4)
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+
+    def start(self):
+        temp_path = self.path + f".{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "port": self.port, "token": self.token}, f)
+        os.replace(temp_path, self.path)
+        self.thread.start()
+        return self
+
+    def serve(self):
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                return
+            with connection:
+                try:
+                    connection.settimeout(2)
+                    data = connection.makefile("r", encoding="utf-8").readline()
+                    request = json.loads(data)
+                    if request.pop("token", None) != self.token:
+                        continue
+                    self.on_request(request)
+                    connection.sendall(b"ok\n")
+                except (OSError, ValueError):
+                    pass
+
+    def stop(self):
+        self.socket.close()
+        # Solo se borra el archivo si sigue siendo el de esta instancia
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                if json.load(f).get("token") != self.token:
+                    return
+            os.remove(self.path)
+        except (OSError, ValueError):
+            pass
+
+
+def forward_to_running(argv, path=None, timeout=1.0):
+    """Envía ``argv`` a la instancia abierta; devuelve True si la atendió."""
+    try:
+        with open(path or instance_file(), encoding="utf-8") as f:
+            info = json.load(f)
+        with socket.create_connection(("127.0.0.1", info["port"]), timeout=timeout) as connection:
+            message = json.dumps({"token": info["token"], "argv": list(argv)}) + "\n"
+            connection.sendall(message.encode("utf-8"))
+            return connection.makefile("r", encoding="utf-8").readline().strip() == "ok"
+    except (OSError, ValueError, KeyError):
+        # Archivo de una instancia que ya no existe
+        return False
@@ -0,0 +1,198 @@
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from deteccion import WindowsRegistry, detect_installed
+
+
+# Resultado de una verificación: "ok", "warning" o "error"
+CheckResult = namedtuple("CheckResult", ["name", "status", "message", "duration"])
+
+STATUS_ICONS = {"ok": "✅", "warning": "⚠️", "error": "❌"}
+
+# Espacio libre mínimo para instalar Office (bytes)
+REQUIRED_FREE_BYTES = 4 * 1024 ** 3
+
+OFFICE_PROCESSES = {
+    "winword.exe", "excel.exe", "powerpnt.exe", "outlook.exe", "msaccess.exe",
+    "onenote.exe", "visio.exe", "winproj.exe", "lync.exe", "mspub.exe", "teams.exe",
+}
+
+REBOOT_KEYS = [
+    r"SOFTWARE\Microsoft\Windows\CurrentVersion\Component Based Servicing\RebootPending",
+    r"SOFTWARE\Microsoft\Windows\CurrentVersion\WindowsUpdate\Auto Update\RebootRequired",
+]
+
+
+def check_setup(context):
+    if context["setup_path"]:
+        return "ok", f"setup.exe encontrado: {context['setup_path']}"
+    return "error", "No se encontró setup.exe"
+
+
+def check_disk_space(context):
+    drive = os.environ.get("SystemDrive", "C:") + "\\" if os.name == "nt" else os.path.abspath(os.sep)
+    free = shutil.disk_usage(drive).free
+    message = f"{free / 1024 ** 3:.1f} GB libres en {drive}"
+    if free < REQUIRED_FREE_BYTES:
+        return "error", f"{message} (se necesitan {REQUIRED_FREE_BYTES / 1024 ** 3:.0f} GB)"
+    return "ok", message
+
+
+def check_pending_reboot(context):
+    try:
+        import winreg
+    except ImportError:
+        return "ok", "No aplica fuera de Windows"
+    for path in REBOOT_KEYS:
+        try:
+            winreg.CloseKey(winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path))
+            return "warning", "Windows tiene un reinicio pendiente"
+        except OSError:
+            pass
+    return "ok", "Sin reinicios pendientes"
+
+
+def check_office_processes(context):
+    if os.name != "nt":
+        return "ok", "No aplica fuera de Windows"
+    import subprocess
+    output = subprocess.run(
+        ["tasklist", "/FO", "CSV", "/NH"],
+        capture_output=True,
+        text=True,
+        errors="replace",
+        timeout=context["timeout"],
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    ).stdout
+    running = sorted({
+        line.split(",")[0].strip('"') for line in output.splitlines()
+        if line.split(",")[0].strip('"').lower() in OFFICE_PROCESSES
+    })
+    if running:
+        return "error", f"Cierra primero: {', '.join(running)}"
+    return "ok", "No hay aplicaciones de Office abiertas"
+
+
+def check_existing_install(context):
+    installed = detect_installed(context["registry"])
+    if installed is None:
+        return "ok", "No hay otra instalación Click-to-Run"
+    products = ", ".join(sorted(installed.products))
+    if context["plan"] is not None and context["plan"].mode != "full":
+        return "ok", f"Instalado: {products} (solo se agregará lo que falta)"
+    return "warning", f"Se reemplazará la instalación existente: {products}"
+
+
+def check_bitness(context):
+    architecture = context["architecture"]
+    windows_64 = "64" in (
+        os.environ.get("PROCESSOR_ARCHITEW6432") or os.environ.get("PROCESSOR_ARCHITECTURE", "AMD64")
+    )
+    if architecture == "64" and not windows_64:
+        return "error", "No se puede instalar Office de 64 bits en Windows de 32 bits"
+    installed = detect_installed(context["registry"])
+    if installed and installed.architecture and installed.architecture != architecture:
+        return "warning", f"Office instalado es de {installed.architecture} bits; se reinstalará a {architecture} bits"
+    return "ok", f"Arquitectura de {architecture} bits compatible"
+
+
+CHECKS = [
+    ("setup.exe", check_setup),
+    ("Espacio en disco", check_disk_space),
+    ("Reinicio pendiente", check_pending_reboot),
+    ("Procesos de Office", check_office_processes),
+    ("Instalación existente", check_existing_install),
+    ("Arquitectura", check_bitness),
+]
+
+# Preparar el origen sin instalar solo necesita espacio para la descarga
+STAGE_CHECKS = [
+    ("Espacio en disco", check_disk_space),
+]
+
+
+def run_checks(context, checks=CHECKS, timeout=10.0):
+    """Ejecuta las verificaciones en paralelo con un tiempo límite común.
+
+    Todas comparten el mismo plazo de ``timeout`` segundos desde el inicio: la
+    que no responde a tiempo se informa como advertencia y no retrasa al resto;
+    una que falla con una excepción se informa como error.
+    """
+    context = dict(context, timeout=timeout)
+    executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="preflight")
+    started = time.monotonic()
+    futures = [(name, executor.submit(timed, check, context)) for name, check in checks]
+
+    results = []
+    for name, future in futures:
+        remaining = max(0.0, started + timeout - time.monotonic())
+        try:
+            status, message, duration = future.result(timeout=remaining)
+        except FutureTimeout:
+            status, message, duration = "warning", f"Sin respuesta tras {timeout:g} s", timeout
+        except Exception as e:
+            status, message, duration = "error", f"Error al verificar: {e}", time.monotonic() - started
+        results.append(CheckResult(name, status, message, duration))
+
+    # No esperar a las verificaciones colgadas
+    executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def timed(check, context):
+    start = time.monotonic()
+    status, message = check(context)
+    return status, message, time.monotonic() - start
+
+
+def summarize(results):
+    return "\n".join(f"{STATUS_ICONS[r.status]} {r.name}: {r.message}" for r in results)
+
+
+def has_errors(results):
+    return any(result.status == "error" for result in results)
+
+
+class PreflightCache:
+    """Guarda los resultados por selección durante ``ttl`` segundos."""
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+            return None
+
+    def put(self, key, results):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+
+    def run(self, key, context, **kwargs):
+        """Devuelve los resultados en caché o ejecuta las verificaciones."""
+        results = self.get(key)
+        if results is None:
+            results = run_checks(context, **kwargs)
+            # Los errores suelen corregirse enseguida: solo se guarda lo correcto
+            if not has_errors(results):
+                self.put(key, results)
+        return results
+
+
+def preflight_context(version, architecture, language, setup_path, plan=None, registry=None):
+    return {
+        "version": version,
+        "architecture": architecture,
+        "language": language,
+        "setup_path": setup_path,
+        "plan": plan,
+        "registry": WindowsRegistry() if registry is None else registry,
+    }